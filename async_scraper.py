@@ -0,0 +1,294 @@
+import asyncio
+from contextlib import nullcontext
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from http_cache import ResponseCache
+from listings import Listing, ListingBatch
+from locales import locale_for_url
+from metrics import increment
+from rate_limiter import Backoff, parse_retry_after, THROTTLE_STATUSES
+from single_flight import AsyncSingleFlight
+from scraper import (
+    HEADERS,
+    MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    DEFAULT_POOL_SIZE,
+    build_page_url,
+    normalize_url,
+    parse_listings,
+    get_cache,
+    get_rate_limiter,
+    is_retryable,
+    is_throttled,
+)
+
+# Maximum number of page requests in flight across all searches
+DEFAULT_CONCURRENCY = 32
+
+# Pages being scraped, so concurrent searches for the same page share one
+# fetch and parse
+_page_flights = AsyncSingleFlight()
+
+def create_async_client(pool_size: int = DEFAULT_POOL_SIZE) -> httpx.AsyncClient:
+    """
+    Create an httpx client with pooled keep-alive connections
+
+    Args:
+        pool_size: Maximum number of open connections
+
+    Returns:
+        AsyncClient preloaded with the scraper's browser headers
+    """
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        timeout=10,
+        follow_redirects=True
+    )
+
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    """scraper.is_retryable for httpx errors"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return is_retryable(error)
+    return isinstance(error, httpx.TransportError)
+
+async def _fetch_page_async(
+    client: httpx.AsyncClient,
+    url: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[ResponseCache] = None
+) -> str:
+    """
+    Download one results page without blocking the event loop
+
+    Paced and retried like scraper._fetch_page, sharing its rate limiter.
+    """
+    limiter = get_rate_limiter()
+    backoff = Backoff(RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    cached = None
+    if cache is not None:
+        cache_key = normalize_url(url)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None and cached.fresh:
+            return cached.body
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            async with semaphore or nullcontext():
+                await limiter.acquire_async(url)
+                response = await client.get(
+                    url, headers=cached.conditional_headers() if cached else None
+                )
+            increment('fetch_requests')
+
+            if response.status_code in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                limiter.on_throttle(url, retry_after if retry_after is not None else backoff.next())
+                increment('fetch_throttled')
+                response.raise_for_status()
+            limiter.on_success(url)
+
+            # Stale entry confirmed unchanged by the origin
+            if response.status_code == 304 and cached is not None:
+                await asyncio.to_thread(cache.refresh, cache_key)
+                return cached.body
+
+            response.raise_for_status()
+            if cache is not None:
+                await asyncio.to_thread(
+                    cache.put,
+                    cache_key,
+                    response.text,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+            return response.text
+
+        except httpx.HTTPError as e:
+            if not _is_retryable(e):
+                increment('fetch_failures')
+                raise Exception(f"Failed to fetch eBay results: {str(e)}")
+            if attempt == MAX_RETRIES - 1:  # Last attempt
+                increment('fetch_failures')
+                raise Exception(f"Failed to fetch eBay results after {MAX_RETRIES} attempts: {str(e)}")
+            increment('fetch_retries')
+            # Back off without holding a concurrency slot; a throttling
+            # host is already paused by the rate limiter
+            if not is_throttled(e):
+                await asyncio.sleep(backoff.next())
+
+async def _scrape_page_async(
+    client: httpx.AsyncClient,
+    url: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> ListingBatch:
+    """
+    Fetch and parse a single results page
+
+    Concurrent calls for the same page (by normalized URL) on one event
+    loop share one fetch and parse. The shared ListingBatch must not be
+    modified in place.
+    """
+    key = (normalize_url(url), parser, client, cache)
+    batch, shared = await _page_flights.do_shared(
+        key, _fetch_and_parse_async, client, url, semaphore, cache, parser
+    )
+    if shared:
+        increment('pages_coalesced')
+    return batch
+
+async def _fetch_and_parse_async(
+    client: httpx.AsyncClient,
+    url: str,
+    semaphore: Optional[asyncio.Semaphore],
+    cache: Optional[ResponseCache],
+    parser: Optional[str]
+) -> ListingBatch:
+    html = await _fetch_page_async(client, url, semaphore, cache)
+    # Parsing is CPU-bound; keep it off the event loop so other fetches proceed
+    return await asyncio.to_thread(parse_listings, html, parser, locale_for_url(url))
+
+async def aiter_listing_pages(
+    url: str,
+    pages: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> AsyncIterator[Tuple[int, ListingBatch]]:
+    """
+    Asynchronously yield the pages of a search as they are parsed
+
+    All pages are requested concurrently and yielded in page order, each
+    as soon as it and the pages before it have arrived. Iteration stops at
+    the first empty page and requests still in flight are cancelled.
+
+    Args:
+        url: eBay search URL
+        pages: Number of result pages to fetch (60 items each)
+        client: Client to fetch with; a temporary one is created if omitted
+        semaphore: Semaphore bounding concurrent requests, shared across calls
+        cache: Response cache to use; defaults to the configured module cache
+        parser: Listing parser backend name (see listing_parser.PARSER_BACKENDS)
+
+    Yields:
+        Tuples of (page number, ListingBatch) in page order
+    """
+    if client is None:
+        async with create_async_client() as client:
+            async for item in aiter_listing_pages(url, pages, client, semaphore, cache, parser):
+                yield item
+        return
+
+    cache = cache or get_cache()
+    page_urls = [build_page_url(url, page) for page in range(1, max(pages, 1) + 1)]
+    tasks = [
+        asyncio.ensure_future(_scrape_page_async(client, page_url, semaphore, cache, parser))
+        for page_url in page_urls
+    ]
+    try:
+        for page, task in enumerate(tasks, 1):
+            batch = await task
+            if not len(batch):
+                break
+            yield page, batch
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Collect cancelled and failed fetches so none is reported as unretrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def aiter_listings(
+    url: str,
+    pages: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> AsyncIterator[Listing]:
+    """
+    Asynchronously stream the listings of a search one at a time
+
+    Takes the same arguments as aiter_listing_pages; a page's listings are
+    yielded as soon as it has been parsed.
+    """
+    async for _, batch in aiter_listing_pages(url, pages, client, semaphore, cache, parser):
+        for listing in batch:
+            yield listing
+
+async def scrape_ebay_results_async(
+    url: str,
+    pages: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> Tuple[List[str], List[float]]:
+    """
+    Scrape product titles and prices from eBay search results asynchronously
+
+    All pages are requested concurrently and concatenated in page order,
+    stopping at the first empty page.
+
+    Args:
+        url: eBay search URL
+        pages: Number of result pages to fetch (60 items each)
+        client: Client to fetch with; a temporary one is created if omitted
+        semaphore: Semaphore bounding concurrent requests, shared across calls
+        cache: Response cache to use; defaults to the configured module cache
+        parser: Listing parser backend name (see listing_parser.PARSER_BACKENDS)
+
+    Returns:
+        Tuple of (list of product titles, list of prices)
+    """
+    titles = []
+    prices = []
+    async for _, batch in aiter_listing_pages(url, pages, client, semaphore, cache, parser):
+        titles.extend(batch.titles)
+        prices.extend(batch.prices)
+    return titles, prices
+
+async def scrape_many_async(
+    urls: Sequence[str],
+    pages: int = 1,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: Optional[httpx.AsyncClient] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None,
+    return_exceptions: bool = False
+) -> List[Union[Tuple[List[str], List[float]], Exception]]:
+    """
+    Scrape many searches concurrently under one global concurrency limit
+
+    Args:
+        urls: eBay search URLs
+        pages: Number of result pages to fetch per URL
+        concurrency: Maximum page requests in flight across all URLs
+        client: Client to fetch with; a temporary one is created if omitted
+        cache: Response cache to use; defaults to the configured module cache
+        parser: Listing parser backend name
+        return_exceptions: Return a failed search's exception in its slot
+            instead of raising it
+
+    Returns:
+        (titles, prices) tuples in the same order as urls
+    """
+    if client is None:
+        async with create_async_client(concurrency) as client:
+            return await scrape_many_async(
+                urls, pages, concurrency, client, cache, parser, return_exceptions
+            )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(
+            scrape_ebay_results_async(url, pages, client, semaphore, cache, parser)
+            for url in urls
+        ),
+        return_exceptions=return_exceptions
+    )
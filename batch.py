@@ -0,0 +1,290 @@
+"""
+Batch analysis of many eBay search URLs
+
+Usage:
+    python batch.py urls.txt -o results.jsonl --workers 16 --pages 2
+
+The input file holds one search URL per line (blank lines and lines starting
+with '#' are ignored). Results are written incrementally, one record per URL,
+to JSONL or to a directory of Parquet files. Every URL whose record is on
+disk is appended to a checkpoint file so an interrupted run picks up where
+it stopped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, List, Optional, Set
+
+from metrics import enable as enable_metrics, write_prometheus
+from scraper import scrape_ebay_results
+from text_analyzer import analyze_keywords, suggest_title, calculate_price_stats, profile_for_url
+
+DEFAULT_WORKERS = 8
+PARQUET_ROWS_PER_GROUP = 500
+
+def analyze_search(url: str, pages: int = 1) -> Dict:
+    """
+    Scrape one search URL and run the full keyword and price analysis
+
+    Args:
+        url: eBay search URL
+        pages: Number of result pages to fetch
+
+    Returns:
+        Result record with keyword term and document frequencies, price
+        statistics and suggested title
+    """
+    titles, prices = scrape_ebay_results(url, pages=pages)
+    # Bulk runs use the fast regex tokenizer
+    keyword_freq = analyze_keywords(titles, profile_for_url(url, tokenizer='regex'))
+    return {
+        'url': url,
+        'scraped_at': time.time(),
+        'item_count': len(titles),
+        'keywords': keyword_freq,
+        'keyword_listings': keyword_freq.doc_freq,
+        'price_stats': calculate_price_stats(prices),
+        'suggested_title': suggest_title(keyword_freq, optimize=True),
+    }
+
+def read_urls(path: str) -> List[str]:
+    """Read search URLs from a file, skipping blanks, comments and duplicates"""
+    urls = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#') and url not in seen:
+                seen.add(url)
+                urls.append(url)
+    return urls
+
+def read_checkpoint(path: str) -> Set[str]:
+    """Return the URLs already completed according to a checkpoint file"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def _truncate_partial_line(path: str, chunk_size: int = 64 * 1024) -> None:
+    """Cut a file back to just after its last newline"""
+    try:
+        f = open(path, 'rb+')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            f.truncate(position)
+
+class JsonlWriter:
+    """
+    Append result records to a JSON Lines file
+
+    A run killed in the middle of a write leaves a partial last line; it is
+    cut off when the file is reopened so the next record starts on a line
+    of its own. Its URL was never checkpointed, so it is analyzed again.
+    """
+
+    def __init__(self, path: str):
+        _truncate_partial_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: Dict) -> List[str]:
+        """Write a record, returning the URLs now safely on disk"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        return [record['url']]
+
+    def close(self) -> List[str]:
+        self._file.close()
+        return []
+
+class ParquetWriter:
+    """
+    Append result records to a directory of Parquet files
+
+    Records are buffered and every flush writes them as a complete part file
+    of its own, under a hidden temporary name that is renamed once the file
+    is closed. A killed run therefore never leaves a file without a footer,
+    and earlier output survives restarts.
+    """
+
+    def __init__(self, directory: str, rows_per_group: int = PARQUET_ROWS_PER_GROUP):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema([
+            ('url', pa.string()),
+            ('scraped_at', pa.float64()),
+            ('item_count', pa.int64()),
+            ('keywords', pa.map_(pa.string(), pa.int64())),
+            ('keyword_listings', pa.map_(pa.string(), pa.int64())),
+            ('price_stats', pa.map_(pa.string(), pa.float64())),
+            ('suggested_title', pa.string()),
+        ])
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._prefix = f'part-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}'
+        self._parts = 0
+        self._rows_per_group = rows_per_group
+        self._buffer: List[Dict] = []
+
+    def write(self, record: Dict) -> List[str]:
+        """Buffer a record, returning the URLs written by a resulting flush"""
+        self._buffer.append({
+            **record,
+            'keywords': list(record['keywords'].items()),
+            'keyword_listings': list(record['keyword_listings'].items()),
+            'price_stats': list(record['price_stats'].items()),
+        })
+        if len(self._buffer) >= self._rows_per_group:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[str]:
+        """Write the buffered records as a new part file, returning their URLs"""
+        if not self._buffer:
+            return []
+        table = self._pa.Table.from_pylist(self._buffer, schema=self._schema)
+        name = f'{self._prefix}-{self._parts:05d}.parquet'
+        tmp_path = os.path.join(self._directory, f'.{name}.tmp')
+        self._pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self._directory, name))
+        self._parts += 1
+        urls = [row['url'] for row in self._buffer]
+        self._buffer = []
+        return urls
+
+    def close(self) -> List[str]:
+        return self.flush()
+
+def _open_writer(output: str, fmt: Optional[str]):
+    fmt = fmt or ('jsonl' if output.endswith(('.jsonl', '.json')) else 'parquet')
+    if fmt == 'jsonl':
+        return JsonlWriter(output)
+    if fmt == 'parquet':
+        return ParquetWriter(output)
+    raise ValueError(f"Unsupported output format '{fmt}', expected 'jsonl' or 'parquet'")
+
+def run_batch(
+    urls: Iterable[str],
+    output: str,
+    workers: int = DEFAULT_WORKERS,
+    pages: int = 1,
+    checkpoint: Optional[str] = None,
+    fmt: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Analyze many search URLs in parallel, writing results as they finish
+
+    Args:
+        urls: eBay search URLs
+        output: JSONL file, or directory for Parquet part files
+        workers: Number of searches processed concurrently
+        pages: Number of result pages to fetch per search
+        checkpoint: File recording finished URLs; defaults to output + '.checkpoint'
+        fmt: 'jsonl' or 'parquet'; inferred from the output name if omitted
+
+    Returns:
+        Counts of 'done', 'skipped' and 'failed' URLs
+    """
+    checkpoint = checkpoint or output.rstrip('/\\') + '.checkpoint'
+    completed = read_checkpoint(checkpoint)
+    urls = list(urls)
+    pending = [url for url in urls if url not in completed]
+    summary = {'done': 0, 'skipped': len(urls) - len(pending), 'failed': 0}
+
+    writer = _open_writer(output, fmt)
+    with open(checkpoint, 'a', encoding='utf-8') as checkpoint_file:
+        # URLs are checkpointed only once the writer reports their rows on disk
+        def mark_done(done_urls: List[str]) -> None:
+            for done_url in done_urls:
+                checkpoint_file.write(done_url + '\n')
+            checkpoint_file.flush()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                remaining = iter(pending)
+                in_flight = {}
+
+                # Keep a bounded window of searches in flight
+                def submit_next() -> bool:
+                    url = next(remaining, None)
+                    if url is None:
+                        return False
+                    in_flight[executor.submit(analyze_search, url, pages)] = url
+                    return True
+
+                for _ in range(workers * 2):
+                    if not submit_next():
+                        break
+
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        url = in_flight.pop(future)
+                        try:
+                            record = future.result()
+                        except Exception as e:
+                            # Left out of the checkpoint so the next run retries it
+                            print(f"Error analyzing {url}: {str(e)}", file=sys.stderr)
+                            summary['failed'] += 1
+                        else:
+                            mark_done(writer.write(record))
+                            summary['done'] += 1
+                        submit_next()
+        finally:
+            mark_done(writer.close())
+
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a file of eBay search URLs")
+    parser.add_argument('input', help="File with one eBay search URL per line")
+    parser.add_argument('-o', '--output', required=True,
+                        help="JSONL file or Parquet output directory")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'],
+                        help="Output format (default: inferred from --output)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Searches processed concurrently")
+    parser.add_argument('--pages', type=int, default=1,
+                        help="Result pages fetched per search")
+    parser.add_argument('--checkpoint',
+                        help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument('--metrics',
+                        help="Write stage timings and counters to this Prometheus text file")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        enable_metrics()
+
+    summary = run_batch(
+        read_urls(args.input),
+        args.output,
+        workers=args.workers,
+        pages=args.pages,
+        checkpoint=args.checkpoint,
+        fmt=args.format
+    )
+    if args.metrics:
+        write_prometheus(args.metrics)
+    print(f"Done: {summary['done']}, skipped: {summary['skipped']}, failed: {summary['failed']}")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
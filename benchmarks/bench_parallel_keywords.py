@@ -0,0 +1,45 @@
+"""
+Measure how analyze_keywords_parallel scales with the number of workers
+
+Usage:
+    python -m benchmarks.bench_parallel_keywords --titles 5000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+
+from benchmarks.corpus import synthetic_titles
+from benchmarks.timing import time_call
+from text_analyzer import (
+    analyze_keywords, analyze_keywords_parallel, get_profile, DEFAULT_CHUNK_SIZE, TOKENIZERS
+)
+
+def _same(a, b) -> bool:
+    return list(a.items()) == list(b.items()) and a.doc_freq == b.doc_freq and a.documents == b.documents
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--titles', type=int, default=1_000_000, help="Number of titles")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help="Worker counts to measure")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='regex')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles, args.seed)
+    profile = get_profile(tokenizer=args.tokenizer)
+
+    reference, baseline = time_call(lambda: analyze_keywords(titles, profile))
+    print(f"{args.titles:,} titles, {args.tokenizer} tokenizer, "
+          f"chunks of {args.chunk_size:,}, {os.cpu_count()} CPUs")
+    print(f"  serial     {baseline:8.2f}s  {args.titles / baseline:12,.0f} titles/s")
+    for workers in args.workers:
+        result, elapsed = time_call(
+            lambda: analyze_keywords_parallel(titles, profile, workers, args.chunk_size)
+        )
+        status = 'identical' if _same(reference, result) else 'MISMATCH'
+        print(f"  {workers:>2} workers {elapsed:8.2f}s  {args.titles / elapsed:12,.0f} titles/s  "
+              f"{baseline / elapsed:5.1f}x  {status}")
+
+if __name__ == "__main__":
+    main()
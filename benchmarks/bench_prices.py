@@ -0,0 +1,49 @@
+"""
+Compare per-item and batch price parsing
+
+Usage:
+    python -m benchmarks.bench_prices --texts 1000000 --batch-size 60
+"""
+import argparse
+import math
+
+from benchmarks.corpus import synthetic_price_texts
+from benchmarks.timing import time_call
+from price_parser import parse_prices
+from scraper import parse_price_text
+
+def _batched(texts, batch_size):
+    prices = []
+    for start in range(0, len(texts), batch_size):
+        prices.extend(parse_prices(texts[start:start + batch_size], 'en_US').low.tolist())
+    return prices
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--texts', type=int, default=1_000_000, help="Number of price texts")
+    parser.add_argument('--batch-size', type=int, default=60,
+                        help="Texts per batch call, e.g. one results page")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    texts = synthetic_price_texts(args.texts, args.seed)
+
+    results = {}
+    results['per-item'] = time_call(lambda: [parse_price_text(t) for t in texts])
+    results[f'batch/{args.batch_size}'] = time_call(lambda: _batched(texts, args.batch_size))
+    results['batch/all'] = time_call(lambda: parse_prices(texts, 'en_US').low.tolist())
+
+    reference = results['per-item'][0]
+    baseline = results['per-item'][1]
+    print(f"{args.texts:,} price texts")
+    for name, (prices, elapsed) in results.items():
+        same = all(
+            (a is None and math.isnan(b)) or a == b
+            for a, b in zip(reference, prices)
+        ) if name != 'per-item' else True
+        status = 'identical' if same else 'MISMATCH'
+        print(f"  {name:<10} {elapsed:8.2f}s  {args.texts / elapsed:12,.0f} texts/s  "
+              f"{baseline / elapsed:5.1f}x  {status}")
+
+if __name__ == "__main__":
+    main()
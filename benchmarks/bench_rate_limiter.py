@@ -0,0 +1,130 @@
+"""
+Scrape a local server that throttles like eBay, with and without adaptive pacing
+
+The server answers at most --capacity requests per second and throttles
+the rest, alternating 429 with a Retry-After header and 503 without one.
+Each mode fetches the same pages on a thread pool through
+scraper._fetch_page; "unpaced" gives the rate limiter a practically
+unlimited rate that throttling never lowers, so only the pauses asked
+for by throttling responses slow it down, as with fixed retry delays.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter --pages 200 --capacity 10 --workers 8
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import generate_page
+import scraper
+from rate_limiter import AdaptiveRateLimiter
+from scraper import _fetch_page, build_page_url, configure_rate_limiter, get_rate_limiter
+
+class ThrottlingServer(ThreadingHTTPServer):
+    """HTTP server answering over-capacity requests with 429 or 503"""
+
+    daemon_threads = True
+
+    def __init__(self, capacity: float, retry_after: int):
+        super().__init__(('127.0.0.1', 0), _ThrottlingHandler)
+        self.page = generate_page('en_US').encode('utf-8')
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.retry_after = retry_after
+        self.statuses = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/sch/i.html?_nkw=anime+dvd'
+
+    def admit(self) -> int:
+        """Status to answer the next request with"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                status = 200
+            else:
+                status = 429 if self.statuses[429] <= self.statuses[503] else 503
+            self.statuses[status] += 1
+            return status
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = self.server.admit()
+        body = self.server.page if status == 200 else b'Too busy'
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run(server: ThrottlingServer, pages: int, workers: int) -> dict:
+    server.statuses.clear()
+    urls = [build_page_url(server.url, page) for page in range(1, pages + 1)]
+
+    def fetch(url):
+        try:
+            _fetch_page(url, per_host_limit=workers)
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = sum(executor.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'fetched': fetched,
+        'failed': pages - fetched,
+        'statuses': dict(server.statuses),
+        'rate': get_rate_limiter().rate(server.url),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--capacity', type=float, default=10.0,
+                        help="Requests per second the server accepts")
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help="Seconds the server asks throttled clients to wait")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThrottlingServer(args.capacity, args.retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{args.pages} pages, server capacity {args.capacity:g} req/s, {args.workers} workers")
+    modes = {
+        'unpaced': lambda: setattr(
+            scraper, '_rate_limiter', AdaptiveRateLimiter(1e6, 1e6, max_rate=1e6, decrease=1.0)
+        ),
+        'adaptive': lambda: configure_rate_limiter(),
+    }
+    try:
+        for name, configure in modes.items():
+            configure()
+            result = run(server, args.pages, args.workers)
+            statuses = result['statuses']
+            throttled = statuses.get(429, 0) + statuses.get(503, 0)
+            print(f"  {name:<9} {result['elapsed']:7.2f}s  {result['fetched'] / result['elapsed']:6.2f} pages/s  "
+                  f"{result['failed']:>4} failed  {throttled:>5} throttled of "
+                  f"{sum(statuses.values()):>5} requests  final rate {result['rate']:,.1f} req/s")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Compare the NLTK and regex tokenization paths of preprocess_text
+
+Usage:
+    python -m benchmarks.bench_tokenizer --titles 1000000
+"""
+import argparse
+
+from benchmarks.corpus import synthetic_titles
+from benchmarks.timing import time_call
+from text_analyzer import get_profile, preprocess_text
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--titles', type=int, default=1_000_000, help="Number of titles")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles, args.seed)
+    nltk_profile = get_profile(tokenizer='nltk')
+    regex_profile = get_profile(tokenizer='regex')
+
+    results = {}
+    results['nltk'] = time_call(lambda: [preprocess_text(t, nltk_profile) for t in titles])
+    results['regex'] = time_call(lambda: [preprocess_text(t, regex_profile) for t in titles])
+
+    reference = results['nltk'][0]
+    baseline = results['nltk'][1]
+    print(f"{args.titles:,} titles")
+    for name, (tokens, elapsed) in results.items():
+        status = 'identical' if tokens == reference else 'MISMATCH'
+        print(f"  {name:<6} {elapsed:8.2f}s  {args.titles / elapsed:12,.0f} titles/s  "
+              f"{baseline / elapsed:5.1f}x  {status}")
+
+if __name__ == "__main__":
+    main()
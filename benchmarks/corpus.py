@@ -0,0 +1,67 @@
+"""Synthetic eBay listing titles for offline benchmarks"""
+import random
+from typing import List
+
+VOCABULARY = [
+    'Anime', 'DVD', 'Blu-ray', 'BLU RAY', 'Japanese', 'Studio', 'Ghibli',
+    'Region', 'Free', 'English', 'Sub', 'Dub', 'Complete', 'Series', 'Box',
+    'Set', 'NEW', 'Sealed', 'Totoro', 'Spirited', 'Away', 'Collector\'s',
+    'Edition', 'Limited', 'Steelbook', '4K', 'UHD', 'Season', '1-3', 'Vol.',
+    'Import', 'Japan', 'NTSC', 'PAL', 'Movie', 'Film', 'Collection', '(2001)',
+    'Miyazaki', 'Hayao', 'Princess', 'Mononoke', 'Howl\'s', 'Moving', 'Castle',
+    'w/', 'Slipcover', '&', 'Rare', 'OOP', 'Official', '#1', 'Kiki\'s',
+    'Delivery', 'Service', '“Ponyo”', 'Nausicaä', 'cannot', 'miss', '–', 'Lot',
+]
+
+def synthetic_titles(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate listing-like titles from a fixed vocabulary
+
+    Args:
+        count: Number of titles
+        seed: Random seed, so runs are comparable
+
+    Returns:
+        List of titles of 5 to 14 words
+    """
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choices(VOCABULARY, k=rng.randint(5, 14)))
+        for _ in range(count)
+    ]
+
+def synthetic_price_texts(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate price element texts like those on en_US result pages
+
+    About one in ten is a price range and one in fifty has no price.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        roll = rng.random()
+        low = rng.lognormvariate(3, 1.2)
+        if roll < 0.02:
+            texts.append(None)
+        elif roll < 0.12:
+            texts.append(f"${low:,.2f} to ${low * rng.uniform(1.2, 3):,.2f}")
+        else:
+            texts.append(f"${low:,.2f}")
+    return texts
+
+# Largest number of distinct titles generated; bigger corpora repeat them
+MAX_UNIQUE_TITLES = 1_000_000
+
+def title_corpus(count: int, seed: int = 0) -> List[str]:
+    """
+    Synthetic titles for corpora of any size, up to tens of millions
+
+    Above MAX_UNIQUE_TITLES the distinct titles are repeated, so a 10M
+    title corpus is a list of references rather than 10M new strings and
+    fits in memory next to the structures being measured.
+    """
+    unique = synthetic_titles(min(count, MAX_UNIQUE_TITLES), seed)
+    if count <= len(unique):
+        return unique
+    repeats, rest = divmod(count, len(unique))
+    return unique * repeats + unique[:rest]
@@ -0,0 +1,188 @@
+"""
+Saved search result pages for offline benchmarks
+
+Pages live in benchmarks/pages as <locale>-<search>-p<page>.html. The
+committed set is written by `generate` in the markup of eBay's s-item
+result layout (placeholder "Shop on eBay" item, price ranges, auctions,
+sold listings, free shipping) for each supported site; `record` saves a
+live page next to them so real pages can be added to the corpus.
+
+Usage:
+    python -m benchmarks.fixtures generate
+    python -m benchmarks.fixtures record "https://www.ebay.com/sch/i.html?_nkw=anime+dvd&_pgn=2" --name anime-dvd
+"""
+import argparse
+import html
+import os
+import random
+from urllib.parse import parse_qs, urlparse
+from typing import Dict, List, NamedTuple
+
+import requests
+
+from benchmarks.corpus import synthetic_titles
+from locales import locale_for_url
+from scraper import build_page_url, HEADERS
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+# Site of each locale, and how it writes prices and shipping
+_SITES = {
+    'en_US': {'host': 'www.ebay.com', 'price': '${:,.2f}', 'to': 'to',
+              'shipping': '+{} shipping', 'free': 'Free shipping', 'bids': '{} bids'},
+    'en_GB': {'host': 'www.ebay.co.uk', 'price': '£{:,.2f}', 'to': 'to',
+              'shipping': '+{} postage', 'free': 'Free postage', 'bids': '{} bids'},
+    'de_DE': {'host': 'www.ebay.de', 'price': 'EUR {:,.2f}', 'to': 'bis',
+              'shipping': '+{} Versand', 'free': 'Versand kostenlos', 'bids': '{} Gebote'},
+    'fr_FR': {'host': 'www.ebay.fr', 'price': '{:,.2f} EUR', 'to': 'à',
+              'shipping': '+{} de frais de livraison', 'free': 'Livraison gratuite',
+              'bids': '{} enchères'},
+}
+
+class FixturePage(NamedTuple):
+    """A saved results page and the search it belongs to"""
+    name: str
+    locale: str
+    url: str
+    html: str
+
+def _format_price(amount: float, locale: str) -> str:
+    text = _SITES[locale]['price'].format(amount)
+    if locale in ('de_DE', 'fr_FR'):
+        # Swap to comma decimals with '.' (de) or no-break space (fr) thousands
+        thousands = '.' if locale == 'de_DE' else '\u00a0'
+        text = text.replace(',', '\0').replace('.', ',').replace('\0', thousands)
+    return text
+
+def _item(rng: random.Random, index: int, title: str, locale: str) -> str:
+    site = _SITES[locale]
+    price = rng.lognormvariate(3.5, 1.3)
+    roll = rng.random()
+    if roll < 0.1:
+        price_html = (f'{_format_price(price, locale)}<span class="DEFAULT"> {site["to"]} </span>'
+                      f'{_format_price(price * rng.uniform(1.2, 3), locale)}')
+    else:
+        price_html = _format_price(price, locale)
+    shipping = site['free'] if rng.random() < 0.4 else site['shipping'].format(
+        _format_price(rng.uniform(2, 15), locale))
+    extras = ''
+    if roll > 0.8:
+        extras += f'<span class="s-item__bids s-item__bidCount">{site["bids"].format(rng.randint(0, 40))}</span>'
+    if roll > 0.9:
+        extras += '<div class="s-item__caption"><span class="s-item__caption--signal POSITIVE">Sold  Sep 14, 2026</span></div>'
+    new_listing = '<span class="LIGHT_HIGHLIGHT">New Listing</span>' if index % 9 == 0 else ''
+    item_id = 100000000000 + rng.randrange(10 ** 11)
+    href = f'https://{site["host"]}/itm/{item_id}?hash=item{item_id:x}&amp;amdata=enc%3AAQAI'
+    return (
+        '<li class="s-item s-item__pl-on-bottom" data-viewport=\'{"trackableId":"0"}\'>'
+        '<div class="s-item__wrapper clearfix">'
+        '<div class="s-item__image-section"><div class="s-item__image">'
+        f'<a tabindex="-1" href="{href}"><div class="s-item__image-wrapper image-treatment">'
+        f'<img alt="{html.escape(title)}" src="https://i.ebayimg.com/images/g/x/s-l225.jpg" loading="lazy"/>'
+        '</div></a></div></div>'
+        '<div class="s-item__info clearfix">'
+        f'<a class="s-item__link" href="{href}">'
+        f'<div class="s-item__title">{new_listing}<span role="heading" aria-level="3">{html.escape(title)}</span></div></a>'
+        '<div class="s-item__subtitle"><span class="SECONDARY_INFO">'
+        f'{rng.choice(["Brand New", "Pre-Owned", "Open Box", "Neu", "Occasion"])}</span></div>'
+        '<div class="s-item__details clearfix">'
+        f'<div class="s-item__detail s-item__detail--primary"><span class="s-item__price">{price_html}</span></div>'
+        f'<div class="s-item__detail s-item__detail--primary">{extras}</div>'
+        f'<div class="s-item__detail s-item__detail--primary"><span class="s-item__shipping s-item__logisticsCost">{shipping}</span></div>'
+        '<div class="s-item__detail s-item__detail--secondary"><span class="s-item__seller-info">'
+        f'<span class="s-item__seller-info-text">seller{rng.randrange(10000)} (1,234) 99.{rng.randrange(10)}%</span></span></div>'
+        '</div></div></div></li>'
+    )
+
+def generate_page(locale: str, items: int = 60, seed: int = 0) -> str:
+    """Build a results page in the s-item layout with `items` listings"""
+    rng = random.Random(seed)
+    titles = synthetic_titles(items, seed)
+    head = (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>eBay</title>'
+        '<style>.s-item__title{font-weight:400}.s-item__price{font-size:1.5rem}</style>'
+        '<script>window.SRP={"items":"<div class=\'s-item__wrapper\'>","n":1<2};</script>'
+        '</head><body><header class="gh-header"><nav>'
+        + ''.join(f'<a class="gh-link" href="/b/{i}">Category {i}</a>' for i in range(120))
+        + '</nav></header><div class="srp-river-results"><ul class="srp-results srp-list clearfix">'
+    )
+    placeholder = (
+        '<li class="s-item"><div class="s-item__wrapper clearfix"><div class="s-item__info clearfix">'
+        '<a class="s-item__link" href="https://ebay.com/itm/123456"><div class="s-item__title">'
+        '<span role="heading" aria-level="3">Shop on eBay</span></div></a>'
+        '<span class="s-item__price">$20.00</span></div></div></li>'
+    )
+    body = ''.join(_item(rng, i, title, locale) for i, title in enumerate(titles))
+    return head + placeholder + body + '</ul></div><script>var srpLoaded=true;</script></body></html>'
+
+def _url_for(locale: str, query: str, page: int = 1) -> str:
+    url = f'https://{_SITES[locale]["host"]}/sch/i.html?_nkw={query.replace("-", "+")}&_ipg=60'
+    return build_page_url(url, page)
+
+def generate(pages_per_locale: int = 2) -> List[str]:
+    """Write the generated fixture pages, returning their paths"""
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    paths = []
+    for seed, locale in enumerate(_SITES):
+        for page in range(1, pages_per_locale + 1):
+            path = os.path.join(PAGES_DIR, f'{locale}-anime-dvd-p{page}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(generate_page(locale, seed=seed * 100 + page))
+            paths.append(path)
+    return paths
+
+def record(url: str, name: str) -> str:
+    """Download a live results page into the fixture corpus"""
+    response = requests.get(url, headers=HEADERS, timeout=10)
+    response.raise_for_status()
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    page = parse_qs(urlparse(url).query).get('_pgn', ['1'])[0]
+    path = os.path.join(PAGES_DIR, f'{locale_for_url(url)}-{name}-p{page}.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<!-- url: {url} -->\n' + response.text)
+    return path
+
+def load_pages() -> List[FixturePage]:
+    """All saved pages, sorted by file name"""
+    pages = []
+    if not os.path.isdir(PAGES_DIR):
+        return pages
+    for filename in sorted(os.listdir(PAGES_DIR)):
+        if not filename.endswith('.html'):
+            continue
+        with open(os.path.join(PAGES_DIR, filename), 'r', encoding='utf-8') as f:
+            text = f.read()
+        name = filename[:-len('.html')]
+        locale, _, query = name.partition('-')
+        query, _, page = query.rpartition('-p')
+        if locale not in _SITES or not page.isdigit():
+            locale, query, page = 'en_US', name, '1'
+        url = _url_for(locale, query, int(page))
+        # Recorded pages start with the URL they were saved from
+        if text.startswith('<!-- url: '):
+            url = text[len('<!-- url: '):text.index(' -->')]
+        pages.append(FixturePage(name, locale_for_url(url), url, text))
+    return pages
+
+def pages_by_url() -> Dict[str, str]:
+    """Saved pages keyed by URL, for serving them to the scraper"""
+    return {page.url: page.html for page in load_pages()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    generated = commands.add_parser('generate', help="Write the generated pages")
+    generated.add_argument('--pages', type=int, default=2, help="Pages per locale")
+    recorded = commands.add_parser('record', help="Save a live results page")
+    recorded.add_argument('url')
+    recorded.add_argument('--name', required=True, help="Short name for the search")
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        for path in generate(args.pages):
+            print(path)
+    else:
+        print(record(args.url, args.name))
+
+if __name__ == "__main__":
+    main()
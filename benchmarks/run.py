@@ -0,0 +1,305 @@
+"""
+Offline benchmark suite for the scraping and analysis hot paths
+
+Measures, without touching the network:
+    parse      parse_listings() on the saved pages, per parser backend
+    tokenize   preprocess_text() over synthetic title sets, per tokenizer
+    count      analyze_keywords() over the same title sets, per tokenizer
+    end_to_end scrape_ebay_listings() served from the saved pages of one
+               site, followed by the analyses main.py runs on a search;
+               requests are not paced, as no real host is involved
+
+Each benchmark reports the median and fastest of its runs, throughput and
+the peak memory it allocates (measured with tracemalloc in one extra run,
+so tracing never slows the timed runs). Results are printed as a table
+and can be written as JSON and compared against an earlier run.
+
+Usage:
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --sizes 60 6000 1000000 10000000 --only tokenize count
+    python -m benchmarks.run --output new.json --compare baseline.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import requests
+
+from benchmarks.corpus import title_corpus
+from benchmarks.fixtures import load_pages
+from benchmarks.timing import time_call
+from listing_parser import PARSER_BACKENDS, get_parser
+from phrases import PhraseCounter
+from scraper import configure_rate_limiter, normalize_url, parse_listings, scrape_ebay_listings
+from text_analyzer import (
+    analyze_keywords, calculate_price_stats, get_profile, preprocess_text, profile_for_url,
+    suggest_title, KeywordAccumulator, TOKENIZERS
+)
+from title_optimizer import optimize_titles
+
+SUITES = ('parse', 'tokenize', 'count', 'end_to_end')
+DEFAULT_SIZES = (60, 6_000, 600_000)
+DEFAULT_REPEAT = 5
+# Stop repeating a benchmark once its runs have taken this long
+DEFAULT_MAX_TIME = 30.0
+# Slowdown beyond which --compare reports a regression
+DEFAULT_THRESHOLD = 0.10
+# Rate limit so high that serving saved pages never waits for a token
+UNPACED_RATE = 1e6
+
+class FixtureSession:
+    """Stand-in for requests.Session answering from saved pages"""
+
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = {normalize_url(url): html for url, html in pages.items()}
+
+    def get(self, url: str, headers=None, timeout=None) -> requests.Response:
+        response = requests.Response()
+        body = self.pages.get(normalize_url(url))
+        response.status_code = 200 if body is not None else 404
+        response._content = (body or '').encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+def _measure(
+    name: str,
+    size: int,
+    unit: str,
+    func: Callable[[], object],
+    repeat: int,
+    max_time: float,
+    memory: bool
+) -> Dict:
+    """Time func up to `repeat` times and optionally trace its peak memory"""
+    runs = []
+    started = time.perf_counter()
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        runs.append(time_call(func)[1])
+        if time.perf_counter() - started >= max_time:
+            break
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    median = statistics.median(runs)
+    result = {
+        'name': name,
+        'size': size,
+        'unit': unit,
+        'runs': runs,
+        'median': median,
+        'min': min(runs),
+        'throughput': size / median if median else None,
+        'peak_memory': peak,
+    }
+    _print_result(result)
+    return result
+
+def _print_result(result: Dict) -> None:
+    peak = result['peak_memory']
+    memory = f"{peak / 2 ** 20:9.1f} MiB" if peak is not None else ''
+    print(f"  {result['name']:<22} {result['size']:>10,} {result['unit']:<8} "
+          f"{result['median'] * 1000:11.2f} ms  {result['throughput']:14,.0f} {result['unit']}/s"
+          f"  {memory}", flush=True)
+
+def bench_parse(pages, args) -> List[Dict]:
+    results = []
+    for backend in PARSER_BACKENDS:
+        try:
+            get_parser(backend)
+        except ValueError as e:
+            print(f"  skipping {backend}: {str(e)}", file=sys.stderr)
+            continue
+        results.append(_measure(
+            f'parse/{backend}', len(pages), 'pages',
+            lambda: [parse_listings(page.html, backend, page.locale) for page in pages],
+            args.repeat, args.max_time, args.memory
+        ))
+    return results
+
+def bench_titles(args) -> List[Dict]:
+    results = []
+    for size in args.sizes:
+        titles = title_corpus(size, args.seed)
+        for tokenizer in args.tokenizers:
+            profile = get_profile(tokenizer=tokenizer)
+            if 'tokenize' in args.only:
+                results.append(_measure(
+                    f'tokenize/{tokenizer}', size, 'titles',
+                    lambda: [preprocess_text(title, profile) for title in titles],
+                    args.repeat, args.max_time, args.memory
+                ))
+            if 'count' in args.only:
+                results.append(_measure(
+                    f'count/{tokenizer}', size, 'titles',
+                    lambda: analyze_keywords(titles, profile),
+                    args.repeat, args.max_time, args.memory
+                ))
+    return results
+
+def _analyze_search(url: str, session: FixtureSession, pages: int, tokenizer: str) -> None:
+    """The work main.run_analysis does for one search, minus storage"""
+    listings = scrape_ebay_listings(url, pages=pages, session=session)
+    titles, prices = listings.titles, listings.prices
+    profile = profile_for_url(url, tokenizer)
+    phrase_counter = PhraseCounter()
+    keyword_freq = KeywordAccumulator(profile, phrases=phrase_counter).update(titles).frequencies()
+    calculate_price_stats(prices)
+    ranked_titles = optimize_titles(keyword_freq, phrase_counter)
+    suggest_title(keyword_freq, optimize=True, optimized=ranked_titles)
+
+def bench_end_to_end(pages, args) -> List[Dict]:
+    searches = defaultdict(list)
+    for page in pages:
+        searches[page.locale].append(page)
+
+    # Saved pages are served locally, so pacing would only time the sleeps
+    configure_rate_limiter(UNPACED_RATE, UNPACED_RATE, max_rate=UNPACED_RATE)
+    results = []
+    try:
+        for locale, site_pages in sorted(searches.items()):
+            session = FixtureSession({page.url: page.html for page in site_pages})
+            url = site_pages[0].url
+            for tokenizer in args.tokenizers:
+                results.append(_measure(
+                    f'end_to_end/{locale}/{tokenizer}', 1, 'searches',
+                    lambda: _analyze_search(url, session, len(site_pages), tokenizer),
+                    args.repeat, args.max_time, args.memory
+                ))
+    finally:
+        configure_rate_limiter()
+    return results
+
+def _metadata(args: argparse.Namespace) -> Dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'options': {
+            'sizes': args.sizes, 'tokenizers': args.tokenizers,
+            'repeat': args.repeat, 'seed': args.seed,
+        },
+    }
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare results against an earlier run
+
+    Args:
+        results: Results of this run
+        baseline: Parsed JSON output of an earlier run
+        threshold: Relative slowdown counted as a regression
+
+    Benchmarks are matched by name and size and compared on their fastest
+    run, which is less affected by a busy machine than the median.
+
+    Returns:
+        Results that got slower by more than threshold
+    """
+    previous = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\nCompared with {baseline.get('meta', {}).get('commit') or 'baseline'} "
+          f"({baseline.get('meta', {}).get('created_at', 'unknown date')})")
+    for result in results:
+        before = previous.get((result['name'], result['size']))
+        if before is None:
+            continue
+        ratio = result['min'] / before['min']
+        status = ''
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+            regressions.append(result)
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        print(f"  {result['name']:<22} {result['size']:>10,}  "
+              f"{before['min'] * 1000:11.2f} ms -> {result['min'] * 1000:11.2f} ms  "
+              f"{ratio:5.2f}x  {status}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=list(SUITES),
+                        help="Benchmarks to run")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Title set sizes for tokenize and count, e.g. 60 to 10000000")
+    parser.add_argument('--tokenizers', nargs='+', choices=TOKENIZERS, default=list(TOKENIZERS))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Timed runs per benchmark")
+    parser.add_argument('--max-time', type=float, default=DEFAULT_MAX_TIME,
+                        help="Seconds after which a benchmark stops repeating")
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="Skip the traced run measuring peak memory")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON to this file ('-' for stdout)")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON output of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    pages = load_pages()
+    if not pages and {'parse', 'end_to_end'} & set(args.only):
+        print("No saved pages; run `python -m benchmarks.fixtures generate`", file=sys.stderr)
+
+    # Print the table to stderr when the JSON goes to stdout
+    if args.output == '-':
+        sys.stdout = sys.stderr
+    print(f"{len(pages)} saved pages, sizes {', '.join(f'{s:,}' for s in args.sizes)}, "
+          f"tokenizers {', '.join(args.tokenizers)}")
+
+    results = []
+    if 'parse' in args.only and pages:
+        results.extend(bench_parse(pages, args))
+    if {'tokenize', 'count'} & set(args.only):
+        results.extend(bench_titles(args))
+    if 'end_to_end' in args.only and pages:
+        results.extend(bench_end_to_end(pages, args))
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    sys.stdout = sys.__stdout__
+    if args.output:
+        report = json.dumps({'meta': _metadata(args), 'results': results}, indent=2)
+        if args.output == '-':
+            print(report)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(report + '\n')
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Timing helper shared by the benchmark scripts"""
+import time
+from typing import Callable, Tuple, TypeVar
+
+T = TypeVar('T')
+
+def time_call(func: Callable[[], T]) -> Tuple[T, float]:
+    """Call func once, returning its result and the seconds it took"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
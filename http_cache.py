@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'http')
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 2000
+
+@dataclass
+class CacheEntry:
+    """A cached response body together with its validators"""
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    fresh: bool
+
+    def conditional_headers(self) -> dict:
+        """Headers turning a refetch into a conditional request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for response bodies
+
+    Each entry is stored as a gzip-compressed body file plus a small JSON
+    metadata file, both named after the SHA-256 of the cache key. Entries
+    older than ttl are reported as stale but kept so that they can be
+    revalidated with ETag/Last-Modified. The metadata file's mtime records
+    the last access and drives least-recently-used eviction once more than
+    max_entries are stored.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: str):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest[:2], digest)
+        return base + '.json', base + '.html.gz'
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key, fresh or stale, or None if absent"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # Record the access for LRU eviction
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+        return CacheEntry(
+            body=body,
+            etag=meta.get('etag'),
+            last_modified=meta.get('last_modified'),
+            stored_at=meta['stored_at'],
+            fresh=time.time() - meta['stored_at'] < self.ttl
+        )
+
+    def put(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """Store body under key, evicting least recently used entries if needed"""
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            'key': key,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }
+        self._atomic_write(body_path, gzip.compress(body.encode('utf-8')))
+        self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        self._evict()
+
+    def refresh(self, key: str) -> None:
+        """Mark an entry as freshly validated, e.g. after a 304 response"""
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['stored_at'] = time.time()
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        except (OSError, ValueError):
+            pass
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for key, if any"""
+        meta_path, _ = self._paths(key)
+        with self._lock:
+            self._remove(meta_path)
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            for meta_path in self._meta_files():
+                self._remove(meta_path)
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _meta_files(self):
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith('.json'):
+                    yield os.path.join(shard_dir, name)
+
+    def _remove(self, meta_path: str) -> None:
+        for path in (meta_path, meta_path[:-len('.json')] + '.html.gz'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for meta_path in self._meta_files():
+                try:
+                    entries.append((os.path.getmtime(meta_path), meta_path))
+                except OSError:
+                    continue
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort()
+            for _, meta_path in entries[:len(entries) - self.max_entries]:
+                self._remove(meta_path)
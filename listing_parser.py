@@ -0,0 +1,249 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Callable, Dict, List, Optional
+import html as html_lib
+import re
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# CSS class of each listing container, and of the nodes pulled out of it
+ITEM_CLASS = 's-item__wrapper'
+LISTING_FIELDS = {
+    'title': 's-item__title',
+    'price': 's-item__price',
+    'shipping': 's-item__shipping',
+    'condition': 'SECONDARY_INFO',
+    'sold_date': 's-item__caption--signal',
+    'seller': 's-item__seller-info-text',
+    'bids': 's-item__bids',
+}
+# Fields read from an attribute rather than the text: field -> (CSS class, attribute)
+LISTING_ATTRIBUTES = {
+    'url': ('s-item__link', 'href'),
+}
+
+# A parsed listing maps each field name to the raw text (or attribute value)
+# of its node, or None
+RawListing = Dict[str, Optional[str]]
+
+def _empty_listing() -> RawListing:
+    return {field: None for field in (*LISTING_FIELDS, *LISTING_ATTRIBUTES)}
+
+def parse_soup(html: str) -> List[RawListing]:
+    """Parse a full BeautifulSoup tree and query it with CSS selectors"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return _extract_from_soup(soup)
+
+def parse_strainer(html: str) -> List[RawListing]:
+    """
+    Build a BeautifulSoup tree containing only the listing containers
+
+    Uses lxml as the tree builder when it is installed.
+    """
+    strainer = SoupStrainer(class_=_has_item_class)
+    soup = BeautifulSoup(html, 'lxml' if HAS_LXML else 'html.parser', parse_only=strainer)
+    return _extract_from_soup(soup)
+
+def _has_item_class(value: Optional[str]) -> bool:
+    # Depending on the bs4 version the strainer sees either single class
+    # names or the full class attribute, so split before matching
+    return bool(value) and ITEM_CLASS in value.split()
+
+def _extract_from_soup(soup) -> List[RawListing]:
+    listings = []
+    for item in soup.select(f'.{ITEM_CLASS}'):
+        listing = {}
+        for field, css_class in LISTING_FIELDS.items():
+            elem = item.select_one(f'.{css_class}')
+            listing[field] = elem.get_text() if elem is not None else None
+        for field, (css_class, attribute) in LISTING_ATTRIBUTES.items():
+            elem = item.select_one(f'.{css_class}[{attribute}]')
+            listing[field] = elem.get(attribute) if elem is not None else None
+        listings.append(listing)
+    return listings
+
+def _class_xpath(css_class: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+def parse_lxml(html: str) -> List[RawListing]:
+    """Parse with lxml and locate listing nodes with XPath"""
+    if not HAS_LXML:
+        raise RuntimeError("The 'lxml' parser backend requires the lxml package")
+    root = lxml.html.fromstring(html)
+    field_paths = {
+        field: f'.//*[{_class_xpath(css_class)}]'
+        for field, css_class in LISTING_FIELDS.items()
+    }
+    attribute_paths = {
+        field: f'(.//*[{_class_xpath(css_class)}]/@{attribute})[1]'
+        for field, (css_class, attribute) in LISTING_ATTRIBUTES.items()
+    }
+    listings = []
+    for item in root.xpath(f'//*[{_class_xpath(ITEM_CLASS)}]'):
+        listing = {}
+        for field, path in field_paths.items():
+            elems = item.xpath(path)
+            listing[field] = elems[0].text_content() if elems else None
+        for field, path in attribute_paths.items():
+            values = item.xpath(path)
+            listing[field] = str(values[0]) if values else None
+        listings.append(listing)
+    return listings
+
+_TOKEN_RE = re.compile(
+    r'<!--.*?-->'                                   # comment
+    r'|<[!?][^>]*>'                                 # doctype / processing instruction
+    r'|<(/?)([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.DOTALL
+)
+_CLASS_RE = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+_ATTRIBUTE_RES = {
+    field: re.compile(
+        rf'''(?<![\w-]){attribute}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE
+    )
+    for field, (_, attribute) in LISTING_ATTRIBUTES.items()
+}
+_RAW_TEXT_TAGS = {'script', 'style'}
+_RAW_TEXT_END = {tag: re.compile(f'</{tag}', re.IGNORECASE) for tag in _RAW_TEXT_TAGS}
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+def _classes(attrs: str):
+    if 'class' not in attrs:
+        return ()
+    match = _CLASS_RE.search(attrs)
+    if not match:
+        return ()
+    return (match.group(1) or match.group(2) or match.group(3) or '').split()
+
+def parse_stream(html: str) -> List[RawListing]:
+    """
+    Extract listings with a single regex-driven pass over the markup
+
+    No tree is built: tags are tokenized in order, an element stack is kept
+    only while inside a listing container, and text is collected only for
+    the nodes named in LISTING_FIELDS.
+    """
+    listings = []
+    field_classes = list(LISTING_FIELDS.items())
+    attribute_classes = [(field, css_class) for field, (css_class, _) in LISTING_ATTRIBUTES.items()]
+
+    stack = []          # tag names open inside the current listing container
+    listing = None      # fields collected for the current listing
+    captures = []       # [field, stack depth, text parts] being collected
+    pos = 0
+    length = len(html)
+
+    while pos < length:
+        match = _TOKEN_RE.search(html, pos)
+        end = match.start() if match else length
+
+        if captures and end > pos:
+            text = html_lib.unescape(html[pos:end])
+            for capture in captures:
+                capture[2].append(text)
+
+        if not match:
+            break
+        pos = match.end()
+
+        tag = match.group(2)
+        if tag is None:
+            continue  # comment or declaration
+        tag = tag.lower()
+        attrs = match.group(3)
+
+        if match.group(1):
+            # End tag: pop back to the matching open element, if any
+            if listing is None or tag not in stack:
+                continue
+            while stack:
+                if stack.pop() == tag:
+                    break
+            depth = len(stack)
+            while captures and captures[-1][1] > depth:
+                field, _, parts = captures.pop()
+                listing[field] = ''.join(parts)
+            if not stack:
+                listings.append(listing)
+                listing = None
+            continue
+
+        self_closing = attrs.endswith('/') or tag in _VOID_TAGS
+        if tag in _RAW_TEXT_TAGS and not self_closing:
+            # Skip script/style bodies so markup inside them is not tokenized;
+            # like get_text(), their text never counts towards a field
+            close = _RAW_TEXT_END[tag].search(html, pos)
+            pos = close.start() if close else length
+
+        if listing is None:
+            if ITEM_CLASS in _classes(attrs) and not self_closing:
+                listing = _empty_listing()
+                stack = [tag]
+            continue
+
+        classes = _classes(attrs)
+        for field, css_class in attribute_classes:
+            if css_class in classes and listing[field] is None:
+                value = _ATTRIBUTE_RES[field].search(attrs)
+                if value:
+                    listing[field] = html_lib.unescape(
+                        value.group(1) or value.group(2) or value.group(3) or ''
+                    )
+
+        if self_closing:
+            continue
+
+        stack.append(tag)
+        if classes:
+            for field, css_class in field_classes:
+                if (css_class in classes and listing[field] is None
+                        and not any(c[0] == field for c in captures)):
+                    captures.append([field, len(stack), []])
+
+    if listing is not None:
+        # Unterminated container at end of document
+        for field, _, parts in captures:
+            listing[field] = ''.join(parts)
+        listings.append(listing)
+
+    return listings
+
+PARSER_BACKENDS: Dict[str, Callable[[str], List[RawListing]]] = {
+    'soup': parse_soup,
+    'strainer': parse_strainer,
+    'lxml': parse_lxml,
+    'stream': parse_stream,
+}
+
+DEFAULT_PARSER = 'stream'
+
+def get_parser(name: Optional[str] = None) -> Callable[[str], List[RawListing]]:
+    """
+    Look up a listing parser backend by name
+
+    Args:
+        name: One of PARSER_BACKENDS, or None for DEFAULT_PARSER
+
+    Returns:
+        Function turning a results page into a list of raw listings
+    """
+    name = name or DEFAULT_PARSER
+    if name not in PARSER_BACKENDS:
+        raise ValueError(
+            f"Unknown parser backend '{name}', expected one of {', '.join(PARSER_BACKENDS)}"
+        )
+    if name == 'lxml' and not HAS_LXML:
+        raise ValueError("The 'lxml' parser backend requires the lxml package")
+    return PARSER_BACKENDS[name]
+
+def set_default_parser(name: str) -> None:
+    """Select the parser backend used when none is passed explicitly"""
+    global DEFAULT_PARSER
+    get_parser(name)
+    DEFAULT_PARSER = name
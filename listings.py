@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+from listing_parser import RawListing
+from price_parser import parse_prices
+
+# Words meaning free shipping on the supported sites
+_FREE_SHIPPING_RE = re.compile(r'\b(?:free|kostenlos|gratuite?)\b', re.IGNORECASE)
+_ITEM_ID_RE = re.compile(r'/itm/(?:[^/?#]+/)?(\d+)')
+_INTEGER_RE = re.compile(r'\d+')
+
+@dataclass(slots=True)
+class Listing:
+    """One search result, as stored in a row of a ListingBatch"""
+    title: str
+    price: Optional[float] = None
+    price_high: Optional[float] = None
+    currency: Optional[str] = None
+    shipping: Optional[float] = None
+    condition: Optional[str] = None
+    sold_date: Optional[str] = None
+    seller: Optional[str] = None
+    bids: Optional[int] = None
+    item_id: Optional[str] = None
+    url: Optional[str] = None
+
+# Column name -> NumPy dtype; float columns use NaN and object columns None
+# for missing values
+LISTING_COLUMNS: Dict[str, type] = {
+    'title': object,
+    'price': np.float64,
+    'price_high': np.float64,
+    'currency': object,
+    'shipping': np.float64,
+    'condition': object,
+    'sold_date': object,
+    'seller': object,
+    'bids': np.float64,
+    'item_id': object,
+    'url': object,
+}
+
+def _clean(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    text = ' '.join(text.split())
+    return text or None
+
+def _text_column(raw: Sequence[RawListing], field: str) -> np.ndarray:
+    return np.array([_clean(listing.get(field)) for listing in raw], dtype=object)
+
+class ListingBatch:
+    """
+    Column-oriented collection of listings
+
+    Each field of Listing is held as one NumPy array, so analysis can work
+    on whole columns and batches convert to pandas or Arrow without
+    building an object per listing. Index or iterate to get Listing rows.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: Optional[Dict[str, np.ndarray]] = None):
+        columns = columns or {}
+        length = len(next(iter(columns.values()))) if columns else 0
+        self.columns = {
+            name: np.asarray(columns[name], dtype=dtype) if name in columns
+            else np.full(length, np.nan if dtype is np.float64 else None, dtype=dtype)
+            for name, dtype in LISTING_COLUMNS.items()
+        }
+
+    @classmethod
+    def from_raw(cls, raw: Sequence[RawListing], locale: Optional[str] = None) -> 'ListingBatch':
+        """
+        Build a batch from parser output, parsing numeric fields per column
+
+        Args:
+            raw: Raw listings from a listing_parser backend
+            locale: Marketplace locale used to read prices and shipping costs
+
+        Returns:
+            ListingBatch with one row per raw listing
+        """
+        prices = parse_prices([listing.get('price') for listing in raw], locale)
+
+        shipping_text = [listing.get('shipping') for listing in raw]
+        shipping = parse_prices(shipping_text, locale).low
+        free = np.array(
+            [bool(text and _FREE_SHIPPING_RE.search(text)) for text in shipping_text], dtype=bool
+        )
+        shipping[free] = 0.0
+
+        bids = np.full(len(raw), np.nan)
+        item_ids = np.full(len(raw), None, dtype=object)
+        for i, listing in enumerate(raw):
+            if listing.get('bids'):
+                match = _INTEGER_RE.search(listing['bids'])
+                if match:
+                    bids[i] = int(match.group())
+            if listing.get('url'):
+                match = _ITEM_ID_RE.search(listing['url'])
+                if match:
+                    item_ids[i] = match.group(1)
+
+        return cls({
+            'title': _text_column(raw, 'title'),
+            'price': prices.low,
+            'price_high': prices.high,
+            'currency': prices.currency,
+            'shipping': shipping,
+            'condition': _text_column(raw, 'condition'),
+            'sold_date': _text_column(raw, 'sold_date'),
+            'seller': _text_column(raw, 'seller'),
+            'bids': bids,
+            'item_id': item_ids,
+            'url': np.array([listing.get('url') for listing in raw], dtype=object),
+        })
+
+    @classmethod
+    def from_listings(cls, listings: Sequence[Listing]) -> 'ListingBatch':
+        """Build a batch from Listing rows"""
+        return cls({
+            name: [
+                np.nan if value is None and dtype is np.float64 else value
+                for value in (getattr(listing, name) for listing in listings)
+            ]
+            for name, dtype in LISTING_COLUMNS.items()
+        })
+
+    @classmethod
+    def concat(cls, batches: Sequence['ListingBatch']) -> 'ListingBatch':
+        """Join batches end to end, e.g. the pages of one search"""
+        if not batches:
+            return cls()
+        return cls({
+            name: np.concatenate([batch.columns[name] for batch in batches])
+            for name in LISTING_COLUMNS
+        })
+
+    def __len__(self) -> int:
+        return len(self.columns['title'])
+
+    def __getitem__(self, index: int) -> Listing:
+        row = {}
+        for name, dtype in LISTING_COLUMNS.items():
+            value = self.columns[name][index]
+            if dtype is np.float64:
+                value = None if np.isnan(value) else float(value)
+            row[name] = value
+        if row['bids'] is not None:
+            row['bids'] = int(row['bids'])
+        return Listing(**row)
+
+    def __iter__(self) -> Iterator[Listing]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def titles(self) -> List[str]:
+        return self.columns['title'].tolist()
+
+    @property
+    def prices(self) -> List[Optional[float]]:
+        """Prices as a list, None where missing (the low end of a range)"""
+        return [None if price != price else price for price in self.columns['price'].tolist()]
+
+    def fingerprint(self) -> str:
+        """Digest of the item IDs, titles and prices; equal for unchanged results"""
+        digest = hashlib.sha256()
+        for name in ('item_id', 'title', 'price', 'price_high'):
+            digest.update(repr(self.columns[name].tolist()).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def to_pandas(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.columns, columns=list(LISTING_COLUMNS))
+        df['bids'] = df['bids'].astype('Int64')
+        return df
+
+    def to_arrow(self):
+        """Convert to a pyarrow Table"""
+        import pyarrow as pa
+
+        arrays = []
+        for name, dtype in LISTING_COLUMNS.items():
+            values = self.columns[name]
+            if name == 'bids':
+                missing = np.isnan(values)
+                arrays.append(pa.array(np.where(missing, 0, values).astype(np.int64),
+                                       mask=missing, type=pa.int64()))
+            elif dtype is np.float64:
+                arrays.append(pa.array(values, from_pandas=True, type=pa.float64()))
+            else:
+                arrays.append(pa.array(values.tolist(), type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=list(LISTING_COLUMNS))
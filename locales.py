@@ -0,0 +1,29 @@
+from typing import Dict
+from urllib.parse import urlparse
+
+# Market settings for each eBay site the app accepts
+LOCALES: Dict[str, Dict[str, str]] = {
+    'en_US': {'language': 'english', 'currency': 'USD', 'decimal': '.'},
+    'en_GB': {'language': 'english', 'currency': 'GBP', 'decimal': '.'},
+    'de_DE': {'language': 'german', 'currency': 'EUR', 'decimal': ','},
+    'fr_FR': {'language': 'french', 'currency': 'EUR', 'decimal': ','},
+    'en_AU': {'language': 'english', 'currency': 'AUD', 'decimal': '.'},
+}
+
+DEFAULT_LOCALE = 'en_US'
+
+DOMAIN_LOCALES = {
+    'ebay.com': 'en_US',
+    'ebay.co.uk': 'en_GB',
+    'ebay.de': 'de_DE',
+    'ebay.fr': 'fr_FR',
+    'ebay.au': 'en_AU',
+    'ebay.com.au': 'en_AU',
+}
+
+def locale_for_url(url: str) -> str:
+    """Return the locale of the eBay site a URL points to"""
+    host = urlparse(url).netloc.lower().split(':')[0]
+    if host.startswith('www.'):
+        host = host[len('www.'):]
+    return DOMAIN_LOCALES.get(host, DEFAULT_LOCALE)
@@ -1,14 +1,402 @@
 import streamlit as st
 import pandas as pd
-from scraper import scrape_ebay_results
-from text_analyzer import analyze_keywords, suggest_title, calculate_price_stats
+import altair as alt
+from cachetools import TTLCache
+from scraper import build_page_url, iter_listing_pages, configure_cache, get_cache, normalize_url
+from listings import ListingBatch
+from storage import SnapshotStore
+from trends import TrendTracker
+from text_analyzer import (
+    suggest_title, profile_for_url, KeywordAccumulator, TOKENIZERS
+)
+from phrases import PhraseCounter
+from price_stats import PriceAccumulator
+from title_optimizer import optimize_titles
+from metrics import (
+    disable as disable_metrics, enable as enable_metrics, observe, render_prometheus,
+    reset as reset_metrics, serve_prometheus, snapshot as metrics_snapshot, timer, METRICS_ENV_VAR, METRICS_PORT_ENV_VAR
+)
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+import math
+import os
 import re
+import sys
+import threading
+import time
+
+# Analysis results are reused across reruns and sessions for this long
+RESULT_CACHE_TTL = 30 * 60
+RESULT_CACHE_MAX_ENTRIES = 100
+
+# Rows sent to the browser per table page
+TABLE_PAGE_SIZE = 50
+
+# Keywords shown in the preview while later result pages are loading
+PREVIEW_KEYWORDS = 15
+
+# Analyses run in the background at once, and how often a waiting session
+# redraws its preview
+ANALYSIS_WORKERS = 4
+PREVIEW_INTERVAL = 0.25
+
+# Called after each scraped page with the page number, the number of
+# listings so far and the running keyword and price accumulators
+PageCallback = Callable[[int, int, KeywordAccumulator, PriceAccumulator], None]
 
 def is_valid_ebay_url(url):
     """Check if the URL is a valid eBay search URL"""
     ebay_pattern = r'https?://(www\.)?ebay\.(com|co\.uk|de|fr|au)/.*'
     return bool(re.match(ebay_pattern, url))
 
+@st.cache_resource
+def get_result_cache() -> Tuple[TTLCache, threading.Lock]:
+    """Process-wide cache of analysis results, shared by all sessions"""
+    return TTLCache(maxsize=RESULT_CACHE_MAX_ENTRIES, ttl=RESULT_CACHE_TTL), threading.Lock()
+
+class AnalysisJob:
+    """
+    A search being analyzed in the background and its progress so far
+
+    The analysis runs on a worker thread without any Streamlit calls, so a
+    session that reruns or closes while waiting can't abort it for the
+    other sessions sharing it; each session draws the progress itself.
+    """
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._progress = None
+
+    def report(self, page: int, items: int, keywords: KeywordAccumulator, prices: PriceAccumulator) -> None:
+        """Page callback for run_analysis recording a snapshot of the results so far"""
+        progress = (page, items, prices.summary(), keywords.term_freq.most_common(PREVIEW_KEYWORDS))
+        with self._lock:
+            self._progress = progress
+
+    def progress(self) -> Optional[Tuple[int, int, Dict[str, float], List[Tuple[str, int]]]]:
+        """Page number, items, price statistics and top keywords of the latest page"""
+        with self._lock:
+            return self._progress
+
+@st.cache_resource
+def get_analysis_jobs() -> Tuple[Dict[Tuple, AnalysisJob], threading.Lock]:
+    """Analyses in progress, so sessions asking for the same search share one run"""
+    return {}, threading.Lock()
+
+@st.cache_resource
+def get_analysis_executor() -> ThreadPoolExecutor:
+    """Worker threads running analyses for all sessions"""
+    return ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='analysis')
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    """Store that every fresh scrape is appended to"""
+    return SnapshotStore()
+
+@st.cache_resource
+def get_trend_tracker() -> TrendTracker:
+    """Per-query keyword and price trends, updated with every snapshot"""
+    return TrendTracker()
+
+@st.cache_resource
+def start_metrics_server(port: int):
+    """Serve Prometheus metrics once per process"""
+    try:
+        return serve_prometheus(port)
+    except OSError as e:
+        print(f"Error starting metrics server on port {port}: {str(e)}", file=sys.stderr)
+        return None
+
+def run_analysis(
+    url: str,
+    pages: int,
+    tokenizer: str,
+    store: SnapshotStore,
+    tracker: TrendTracker,
+    on_page: Optional[PageCallback] = None
+) -> Dict:
+    """
+    Scrape a search, run every analysis on its results and store a snapshot of any changed listings
+
+    Keywords and prices are counted page by page while later pages are
+    still being fetched; on_page, if given, is called after every page so
+    partial results can be shown before the search completes. Runs on a
+    worker thread, so it makes no Streamlit calls: the snapshot store and
+    trend tracker are passed in by the session that started it.
+    """
+    profile = profile_for_url(url, tokenizer)
+    # Keywords and multi-word phrases are counted from the same tokens
+    phrase_counter = PhraseCounter()
+    keywords = KeywordAccumulator(profile, phrases=phrase_counter)
+    price_accumulator = PriceAccumulator()
+    batches = []
+    for page, batch in iter_listing_pages(url, pages=pages):
+        batches.append(batch)
+        keywords.update(batch.titles)
+        with timer('calculate_price_stats'):
+            price_accumulator.update(batch.prices)
+        if on_page is not None:
+            on_page(page, keywords.documents, keywords, price_accumulator)
+
+    listings = ListingBatch.concat(batches)
+    titles, prices = listings.titles, listings.prices
+    result = {'titles': titles, 'prices': prices, 'analyzed_at': time.time()}
+    if not titles:
+        return result
+
+    keyword_freq = keywords.frequencies()
+
+    # Price statistics and distribution of the prices accumulated above
+    with timer('calculate_price_stats'):
+        price_stats = price_accumulator.summary()
+        price_histogram = price_accumulator.histogram()
+
+    # One optimizer run ranks both the suggested title and its alternatives
+    ranked_titles = optimize_titles(keyword_freq, phrase_counter)
+
+    result.update({
+        'keyword_freq': keyword_freq,
+        'phrase_counter': phrase_counter,
+        'price_stats': price_stats,
+        'price_histogram': price_histogram,
+        # Generate suggested title and runner-up alternatives
+        'suggested_title': suggest_title(keyword_freq, optimize=True, optimized=ranked_titles),
+        'title_alternatives': ranked_titles[1:],
+    })
+
+    try:
+        fingerprint = listings.fingerprint()
+        trend = tracker.get(url, pages)
+        # Pages served from the HTTP cache repeat the latest snapshot, which
+        # would only add zero deltas and drag the averages toward old data
+        if trend is not None and trend.fingerprint == fingerprint:
+            return result
+        store.append(
+            url, listings, keyword_freq, result['price_stats'], result['analyzed_at'], pages
+        )
+        tracker.update(
+            url, keyword_freq, len(titles), result['price_stats'], result['analyzed_at'], fingerprint,
+            pages
+        )
+    except Exception as e:
+        # History is a bonus; never fail the analysis over it
+        print(f"Error storing snapshot: {str(e)}", file=sys.stderr)
+    return result
+
+def render_progress(placeholder, job: AnalysisJob, pages: int) -> None:
+    """Draw the results of a running analysis so far into placeholder"""
+    progress = job.progress()
+    if progress is None:
+        return
+    page, items, price_stats, top_keywords = progress
+    with placeholder.container():
+        st.progress(
+            min(page / pages, 1.0),
+            text=f"Scraped page {page} of up to {pages}, {items} items so far..."
+        )
+        item_col, median_col, average_col = st.columns(3)
+        item_col.metric("Items so far", items)
+        median_col.metric("Median Price", f"${price_stats['median']:.2f}")
+        average_col.metric("Average Price", f"${price_stats['average']:.2f}")
+        st.caption("Top keywords so far")
+        st.dataframe(
+            pd.DataFrame(top_keywords, columns=['Keyword', 'Frequency']),
+            use_container_width=True,
+            hide_index=True
+        )
+
+def get_analysis(url: str, pages: int, tokenizer: str) -> Dict:
+    """
+    Return cached analysis results for the search, computing them on a miss
+
+    On a miss the search is analyzed on a worker thread and the results of
+    each page are previewed as soon as it has been scraped, then replaced
+    by the full analysis once it is ready. Sessions missing on the same
+    search at the same time share a single scrape and analysis, and all of
+    them see its preview.
+    """
+    cache, lock = get_result_cache()
+    key = (normalize_url(url), pages, tokenizer)
+    with lock:
+        result = cache.get(key)
+    if result is not None:
+        return result
+
+    jobs, jobs_lock = get_analysis_jobs()
+    # Resolved here on the script thread; the worker must not touch st caches
+    store, tracker = get_snapshot_store(), get_trend_tracker()
+
+    def analyze(job: AnalysisJob) -> Dict:
+        try:
+            analysis = run_analysis(url, pages, tokenizer, store, tracker, on_page=job.report)
+            # Empty results may be transient, so only cache real ones. Caching
+            # before the job is dropped leaves no gap for a duplicate run.
+            if analysis['titles']:
+                with lock:
+                    cache[key] = analysis
+            return analysis
+        finally:
+            with jobs_lock:
+                if jobs.get(key) is job:
+                    del jobs[key]
+
+    with jobs_lock:
+        job = jobs.get(key)
+        if job is None:
+            job = jobs[key] = AnalysisJob()
+            job.future = get_analysis_executor().submit(analyze, job)
+
+    preview = st.empty()
+    try:
+        with st.spinner("Scraping eBay results..."):
+            while True:
+                try:
+                    return job.future.result(timeout=PREVIEW_INTERVAL)
+                except FutureTimeoutError:
+                    render_progress(preview, job, pages)
+    finally:
+        preview.empty()
+
+def paginated_dataframe(
+    df: pd.DataFrame,
+    key: str,
+    search_column: str,
+    page_size: int = TABLE_PAGE_SIZE
+) -> None:
+    """
+    Render a table one page at a time with a text filter
+
+    Only the rows of the current page are sent to the browser, so the
+    payload stays the same size however many rows df has.
+    """
+    search_col, page_col = st.columns([3, 1])
+
+    with search_col:
+        query = st.text_input(f"Search {search_column.lower()}s", key=f"{key}_search")
+    if query:
+        df = df[df[search_column].str.contains(query, case=False, regex=False)]
+
+    page_count = max(1, math.ceil(len(df) / page_size))
+    with page_col:
+        page = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            key=f"{key}_page"
+        )
+
+    start = (int(page) - 1) * page_size
+    end = min(start + page_size, len(df))
+    st.dataframe(
+        df.iloc[start:end],
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(f"Showing {start + 1 if end else 0}–{end} of {len(df)}")
+
+def render_trends(url: str, pages: int) -> None:
+    """Show how keywords and prices of a search moved across snapshots of the same page count"""
+    store = get_snapshot_store()
+    tracker = get_trend_tracker()
+    # Seed the trend from stored snapshots if tracking started after them
+    trend = tracker.get(url, pages) or tracker.rebuild(url, store, pages)
+    if trend is None or trend.snapshots < 2:
+        st.info("Trends appear once this search has been analyzed at least twice. "
+                "A snapshot is stored whenever a new analysis finds changed listings.")
+        return
+
+    movement = trend.price_movement()
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("Snapshots Tracked", trend.snapshots)
+    for metric_col, (label, name) in zip(
+        metric_cols[1:], [("Median Price", 'median'), ("Average Price", 'average')]
+    ):
+        change = movement[f'{name}_change']
+        metric_col.metric(
+            label,
+            f"${movement[name]:.2f}",
+            delta=f"{change:+.2f} ({movement[f'{name}_change_pct']:+.1f}%)" if change is not None else None
+        )
+
+    history = store.load_price_stats(url, pages=pages)
+    if not history.empty:
+        st.caption("Price history")
+        st.line_chart(history, x='scraped_at', y=['median', 'average'], height=250)
+
+    def trend_table(rows):
+        return pd.DataFrame(
+            [(word, share * 100, average * 100, momentum * 100) for word, share, average, momentum in rows],
+            columns=['Keyword', 'Listings %', 'Average %', 'Change (pts)']
+        ).round(1)
+
+    rising_col, falling_col = st.columns(2)
+    with rising_col:
+        st.subheader("📈 Rising Keywords")
+        st.dataframe(trend_table(trend.rising()), use_container_width=True, hide_index=True)
+    with falling_col:
+        st.subheader("📉 Falling Keywords")
+        st.dataframe(trend_table(trend.falling()), use_container_width=True, hide_index=True)
+
+    st.caption("Change since the previous snapshot")
+    st.dataframe(
+        pd.DataFrame(
+            [(word, before * 100, after * 100, delta * 100)
+             for word, before, after, delta in trend.keyword_deltas()[:30]],
+            columns=['Keyword', 'Previous %', 'Latest %', 'Change (pts)']
+        ).round(1),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def render_performance() -> None:
+    """Show the stage timings and counters collected in this process"""
+    with st.expander("⏱️ Performance", expanded=True):
+        metrics = metrics_snapshot()
+        st.caption("Collected across all sessions since the app started or was last reset; "
+                   "searches answered from the result cache add no stage timings")
+        if metrics['stages']:
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        (name, stats['count'], stats['total'] * 1000,
+                         stats['mean'] * 1000, stats['max'] * 1000)
+                        for name, stats in metrics['stages'].items()
+                    ],
+                    columns=['Stage', 'Calls', 'Total (ms)', 'Mean (ms)', 'Max (ms)']
+                ).sort_values('Total (ms)', ascending=False).round(2),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No timings yet. Run a search to collect them.")
+        if metrics['counters']:
+            st.dataframe(
+                pd.DataFrame(list(metrics['counters'].items()), columns=['Counter', 'Value']),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        download_col, reset_col = st.columns(2)
+        download_col.download_button(
+            "Download Prometheus metrics",
+            render_prometheus(),
+            file_name='ebay_analyzer.prom',
+            mime='text/plain'
+        )
+        if reset_col.button("Reset metrics"):
+            reset_metrics()
+            st.rerun()
+
+def toggle_metrics() -> None:
+    """Start or stop collecting metrics as the performance panel is shown or hidden"""
+    if st.session_state['show_performance']:
+        enable_metrics()
+    # Collection configured through the environment stays on
+    elif os.environ.get(METRICS_ENV_VAR) != '1' and not os.environ.get(METRICS_PORT_ENV_VAR):
+        disable_metrics()
+
 def main():
     st.set_page_config(
         page_title="eBay Search Results Analyzer",
@@ -16,6 +404,13 @@ def main():
         layout="wide"
     )
 
+    # Serve repeated searches from the on-disk response cache
+    configure_cache()
+
+    # Expose stage metrics to Prometheus when a port is configured
+    if os.environ.get(METRICS_PORT_ENV_VAR):
+        start_metrics_server(int(os.environ[METRICS_PORT_ENV_VAR]))
+
     st.title("📊 eBay Search Results Analyzer")
     st.markdown("""
     This tool analyzes eBay search results to show you the most common keywords in product titles.
@@ -28,40 +423,90 @@ def main():
         value="https://www.ebay.com/sch/i.html?_nkw=dvd+anime+japanese+blu+ray&_sacat=0&_from=R40&_trksid=p4432023.m570.l1311"
     )
 
+    pages = st.number_input(
+        "Result pages to scrape (60 items each)",
+        min_value=1,
+        max_value=50,
+        value=1
+    )
+
+    with st.sidebar:
+        st.header("Analysis Settings")
+        tokenizer = st.selectbox(
+            "Tokenizer",
+            TOKENIZERS,
+            help="'regex' is a faster tokenizer producing the same keywords"
+        )
+
+        cache, lock = get_result_cache()
+        st.caption(f"{len(cache)} cached result(s), kept for {RESULT_CACHE_TTL // 60} minutes")
+        if st.button("Clear cached results"):
+            with lock:
+                cache.clear()
+            # Drop the search's pages too, so the next run fetches fresh results
+            http_cache = get_cache()
+            if http_cache is not None and url:
+                for page in range(1, int(pages) + 1):
+                    http_cache.delete(normalize_url(build_page_url(url, page)))
+            st.toast("Cached results cleared")
+
+        show_performance = st.checkbox(
+            "Show performance panel",
+            key='show_performance',
+            on_change=toggle_metrics,
+            help="Time network, parsing, analysis and rendering stages"
+        )
+        if show_performance:
+            enable_metrics()
+
     if url:
         if not is_valid_ebay_url(url):
             st.error("Please enter a valid eBay search URL")
             return
 
-        with st.spinner("Scraping eBay results..."):
-            try:
-                titles, prices = scrape_ebay_results(url)
-                if not titles:
-                    st.warning("No results found. Please try a different search.")
-                    return
-
-                st.success(f"Found {len(titles)} items!")
+        try:
+            result = get_analysis(url, int(pages), tokenizer)
+            titles = result['titles']
+            if not titles:
+                st.warning("No results found. Please try a different search.")
+                if show_performance:
+                    render_performance()
+                return
 
-                # Display raw titles
-                with st.expander("Show Raw Titles"):
-                    for i, title in enumerate(titles, 1):
-                        st.text(f"{i}. {title}")
+            render_started = time.perf_counter()
+            st.success(f"Found {len(titles)} items!")
+            st.caption(f"Results from {time.strftime('%H:%M:%S', time.localtime(result['analyzed_at']))}")
 
-                # Analyze keywords
-                keyword_freq = analyze_keywords(titles)
+            # Display raw titles
+            with st.expander("Show Raw Titles"):
+                paginated_dataframe(
+                    pd.DataFrame({
+                        '#': range(1, len(titles) + 1),
+                        'Title': titles,
+                        'Price': result['prices'],
+                    }),
+                    key='titles',
+                    search_column='Title'
+                )
 
-                # Calculate price statistics
-                price_stats = calculate_price_stats(prices)
+            keyword_freq = result['keyword_freq']
+            phrase_counter = result['phrase_counter']
+            price_stats = result['price_stats']
+            suggested_title = result['suggested_title']
 
-                # Generate suggested title
-                suggested_title = suggest_title(keyword_freq)
+            # Create DataFrame for keyword frequency; "Listings" is the
+            # number of titles containing the keyword
+            df = pd.DataFrame(
+                [
+                    (keyword, freq, keyword_freq.doc_freq.get(keyword, 0))
+                    for keyword, freq in keyword_freq.items()
+                ],
+                columns=['Keyword', 'Frequency', 'Listings']
+            ).sort_values('Frequency', ascending=False)
 
-                # Create DataFrame for keyword frequency
-                df = pd.DataFrame(
-                    keyword_freq.items(),
-                    columns=['Keyword', 'Frequency']
-                ).sort_values('Frequency', ascending=False)
+            analysis_tab, trends_tab = st.tabs(["Analysis", "Trends"])
 
+            with analysis_tab:
                 # Display results in columns
                 col1, col2 = st.columns([2, 1])
 
@@ -69,6 +514,10 @@ def main():
                     # Display suggested title
                     st.subheader("📝 Suggested Title")
                     st.info(suggested_title)
+                    if result['title_alternatives']:
+                        with st.expander("Alternative titles"):
+                            for alternative, _ in result['title_alternatives']:
+                                st.text(alternative)
 
                     # Display price statistics
                     st.subheader("💰 Price Analysis")
@@ -82,13 +531,60 @@ def main():
                         st.metric("Median Price", f"${price_stats['median']:.2f}")
                         st.metric("Maximum Price", f"${price_stats['max']:.2f}")
 
+                    # Display pricing bands and distribution
+                    band_cols = st.columns(4)
+                    for band_col, (label, key) in zip(
+                        band_cols,
+                        [("10th Percentile", 'p10'), ("25th Percentile", 'p25'),
+                         ("75th Percentile", 'p75'), ("90th Percentile", 'p90')]
+                    ):
+                        band_col.metric(label, f"${price_stats[key]:.2f}")
+
+                    if result['price_histogram']:
+                        st.caption(f"Price distribution of {price_stats['count']} priced listings")
+                        histogram_df = pd.DataFrame(
+                            [(f"${low:,.2f}–${high:,.2f}", count)
+                             for low, high, count in result['price_histogram']],
+                            columns=['Price Range', 'Listings']
+                        )
+                        # Keep bins in price order rather than alphabetical
+                        st.altair_chart(
+                            alt.Chart(histogram_df).mark_bar().encode(
+                                x=alt.X('Price Range', sort=None),
+                                y='Listings'
+                            ).properties(height=250),
+                            use_container_width=True
+                        )
+
                     # Display keyword frequency table
                     st.subheader("Keyword Frequency Analysis")
-                    st.dataframe(
-                        df,
-                        use_container_width=True,
-                        hide_index=True
-                    )
+                    paginated_dataframe(df, key='keywords', search_column='Keyword')
+
+                    # Display phrase analysis
+                    st.subheader("Phrase Analysis")
+                    phrase_col1, phrase_col2 = st.columns(2)
+
+                    with phrase_col1:
+                        st.caption("Most frequent phrases")
+                        st.dataframe(
+                            pd.DataFrame(
+                                phrase_counter.top_ngrams(2, 15) + phrase_counter.top_ngrams(3, 15),
+                                columns=['Phrase', 'Frequency']
+                            ).sort_values('Frequency', ascending=False),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+
+                    with phrase_col2:
+                        st.caption("Strongest collocations (PMI)")
+                        st.dataframe(
+                            pd.DataFrame(
+                                phrase_counter.top_phrases(15),
+                                columns=['Phrase', 'Frequency', 'PMI']
+                            ).round({'PMI': 2}),
+                            use_container_width=True,
+                            hide_index=True
+                        )
 
                 with col2:
                     st.subheader("Top 30 Keywords")
@@ -101,8 +597,17 @@ def main():
                         height=600  # Increase height to accommodate more bars
                     )
 
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
+            with trends_tab:
+                render_trends(url, int(pages))
+
+            observe('render', time.perf_counter() - render_started)
+            if show_performance:
+                render_performance()
+
+        except Exception as e:
+            st.error(f"An error occurred: {str(e)}")
+    elif show_performance:
+        render_performance()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
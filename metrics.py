@@ -0,0 +1,284 @@
+"""
+Timers and counters for the scraping and analysis stages
+
+Stages are timed with the timer() context manager or the timed()
+decorator, and events counted with increment(). Collection is off unless
+enable() is called or EBAY_ANALYZER_METRICS=1 is set; while it is off,
+timer() hands out one shared no-op context manager and timed() functions
+check a single flag before calling straight through, so instrumented
+stages cost next to nothing. Functions called once per title are not
+wrapped; their callers time them per batch and record the total with
+observe().
+
+Collected metrics can be read with snapshot(), rendered in the Prometheus
+text format with render_prometheus(), written to a file for a node
+exporter's textfile collector with write_prometheus(), or served over
+HTTP with serve_prometheus(). Metrics are per process; work done in
+analyze_keywords_parallel() worker processes is only visible as the
+analyze_keywords_parallel stage of the parent.
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+METRICS_ENV_VAR = 'EBAY_ANALYZER_METRICS'
+# Port the Streamlit app serves /metrics on when set
+METRICS_PORT_ENV_VAR = 'EBAY_ANALYZER_METRICS_PORT'
+PROMETHEUS_PREFIX = 'ebay_analyzer'
+DEFAULT_PORT = 9464
+
+# Upper bounds in seconds of the stage duration histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+class _StageStats:
+    """Duration statistics of one stage"""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Observations per bucket, the last one being +Inf
+        self.buckets = [0] * (bucket_count + 1)
+
+class _NullTimer:
+    """Context manager doing nothing, handed out while collection is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    """Context manager recording the time spent in its block"""
+
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class MetricsRegistry:
+    """Thread-safe store of stage durations and event counters"""
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._stages: Dict[str, _StageStats] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str):
+        """Context manager timing a stage; a no-op while disabled"""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def observe(self, name: str, seconds: float, count: int = 1) -> None:
+        """
+        Record runs of a stage
+
+        Args:
+            name: Stage name
+            seconds: Time spent in the stage
+            count: Number of runs the time covers; runs recorded together
+                (like the per-title stages of a batch) all count with
+                their mean duration
+        """
+        if count < 1:
+            return
+        mean = seconds / count
+        bucket = bisect.bisect_left(self.buckets, mean)
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(len(self.buckets))
+            stats.count += count
+            stats.total += seconds
+            stats.buckets[bucket] += count
+            if mean > stats.max:
+                stats.max = mean
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add to an event counter; a no-op while disabled"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Current metrics as plain data
+
+        Returns:
+            Dict with 'stages', mapping each stage to its count, total,
+            mean and max duration in seconds, and 'counters', mapping each
+            counter to its value
+        """
+        with self._lock:
+            stages = {
+                name: {
+                    'count': stats.count,
+                    'total': stats.total,
+                    'mean': stats.total / stats.count if stats.count else 0.0,
+                    'max': stats.max,
+                }
+                for name, stats in sorted(self._stages.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {'stages': stages, 'counters': counters}
+
+    def render_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        with self._lock:
+            stages = {
+                name: (stats.count, stats.total, list(stats.buckets))
+                for name, stats in sorted(self._stages.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+
+        metric = f'{PROMETHEUS_PREFIX}_stage_seconds'
+        lines = [
+            f'# HELP {metric} Time spent in each scraping and analysis stage',
+            f'# TYPE {metric} histogram',
+        ]
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for name, (count, total, buckets) in stages.items():
+            cumulative = 0
+            for bound, observations in zip(bounds, buckets):
+                cumulative += observations
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {_format_value(total)}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        for name, value in counters.items():
+            counter = f'{PROMETHEUS_PREFIX}_{name}_total'
+            lines.append(f'# TYPE {counter} counter')
+            lines.append(f'{counter} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+_registry = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR) == '1')
+
+def get_registry() -> MetricsRegistry:
+    """Return the process-wide registry the module functions record into"""
+    return _registry
+
+def enable() -> None:
+    """Start collecting metrics"""
+    _registry.enabled = True
+
+def disable() -> None:
+    """Stop collecting metrics; what was recorded is kept"""
+    _registry.enabled = False
+
+def is_enabled() -> bool:
+    return _registry.enabled
+
+def timer(name: str):
+    """
+    Time a block of code as a stage
+
+    Usage:
+        with timer('fetch'):
+            html = download(url)
+    """
+    return _registry.timer(name)
+
+def increment(name: str, amount: float = 1) -> None:
+    """Add to an event counter, e.g. increment('fetch_retries')"""
+    _registry.increment(name, amount)
+
+def observe(name: str, seconds: float, count: int = 1) -> None:
+    """Record time measured by the caller, e.g. summed over a batch of calls"""
+    if _registry.enabled:
+        _registry.observe(name, seconds, count)
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function as a stage"""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def snapshot() -> Dict[str, Dict]:
+    return _registry.snapshot()
+
+def reset() -> None:
+    _registry.reset()
+
+def render_prometheus() -> str:
+    return _registry.render_prometheus()
+
+def write_prometheus(path: str) -> None:
+    """
+    Write the metrics to a Prometheus text file
+
+    The file is replaced atomically, so a textfile collector never reads
+    a partial write.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app's log
+        pass
+
+def serve_prometheus(port: int = DEFAULT_PORT, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve the metrics at http://<host>:<port>/metrics from a daemon thread
+
+    Also enables collection. Call shutdown() on the returned server to stop.
+    """
+    enable()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import heapq
+import math
+
+DEFAULT_MAX_N = 3
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_MIN_COUNT = 3
+
+class BoundedCounter:
+    """
+    Approximate counter holding at most max_entries keys
+
+    Space-Saving with batch eviction: when full, the least frequent half of
+    the keys is discarded and `error` rises to the largest count discarded.
+    A key added afterwards starts at `error`, as it may have been counted
+    and discarded before. Every stored count is therefore an upper bound
+    that overestimates the true count by at most `error`, and a key whose
+    true count exceeds `error` is always stored, however late it first
+    shows up in the stream.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.counts: Dict[str, int] = {}
+        self.error = 0
+
+    def add(self, key: str, count: int = 1) -> None:
+        counts = self.counts
+        stored = counts.get(key)
+        if stored is not None:
+            counts[key] = stored + count
+            return
+        counts[key] = self.error + count
+        if len(counts) > self.max_entries:
+            self._prune()
+
+    def _prune(self) -> None:
+        keep = self.max_entries // 2
+        largest = heapq.nlargest(keep + 1, self.counts.items(), key=lambda x: x[1])
+        if len(largest) > keep:
+            self.error = max(self.error, largest[keep][1])
+        self.counts = dict(largest[:keep])
+
+    def get(self, key: str) -> int:
+        return self.counts.get(key, 0)
+
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        if k is None:
+            return sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return heapq.nlargest(k, self.counts.items(), key=lambda x: x[1])
+
+    def merge(self, other: 'BoundedCounter') -> 'BoundedCounter':
+        """
+        Add another counter's counts into this one
+
+        A key missing from one counter is counted at that counter's error,
+        the most it can have been seen there, so the merged counts stay
+        upper bounds with an error of at most the sum of both errors.
+        """
+        counts = self.counts
+        for key in counts.keys() - other.counts.keys():
+            counts[key] += other.error
+        for key, count in other.counts.items():
+            counts[key] = counts.get(key, self.error) + count
+        self.error += other.error
+        if len(counts) > self.max_entries:
+            self._prune()
+        return self
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+class PhraseCounter:
+    """
+    Single-pass n-gram counter over tokenized titles
+
+    Counts unigrams and all n-grams up to max_n within each title (n-grams
+    never span two titles) in BoundedCounters, so memory stays fixed no
+    matter how many titles are streamed through update().
+    """
+
+    def __init__(self, max_n: int = DEFAULT_MAX_N, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_n < 2:
+            raise ValueError("max_n must be at least 2")
+        self.max_n = max_n
+        self.unigrams = BoundedCounter(max_entries)
+        self.ngrams = {n: BoundedCounter(max_entries) for n in range(2, max_n + 1)}
+        self.documents = 0
+        self.total_tokens = 0
+
+    def update(self, tokens: Sequence[str]) -> None:
+        """Count the n-grams of one title's tokens"""
+        self.documents += 1
+        self.total_tokens += len(tokens)
+        for token in tokens:
+            self.unigrams.add(token)
+        for n, counter in self.ngrams.items():
+            for i in range(len(tokens) - n + 1):
+                counter.add(' '.join(tokens[i:i + n]))
+
+    def update_many(self, token_streams: Iterable[Sequence[str]]) -> 'PhraseCounter':
+        for tokens in token_streams:
+            self.update(tokens)
+        return self
+
+    def merge(self, other: 'PhraseCounter') -> 'PhraseCounter':
+        """Combine counts from another PhraseCounter, e.g. from another worker"""
+        self.unigrams.merge(other.unigrams)
+        for n, counter in self.ngrams.items():
+            if n in other.ngrams:
+                counter.merge(other.ngrams[n])
+        self.documents += other.documents
+        self.total_tokens += other.total_tokens
+        return self
+
+    def top_ngrams(self, n: int, k: int = 20) -> List[Tuple[str, int]]:
+        """Most frequent n-grams of length n"""
+        if n == 1:
+            return self.unigrams.most_common(k)
+        return self.ngrams[n].most_common(k)
+
+    def pmi(self, phrase: str) -> Optional[float]:
+        """
+        Pointwise mutual information of a phrase, in bits
+
+        log2(P(w1..wn) / (P(w1) * ... * P(wn))), with probabilities
+        estimated from token counts. None if any part has been pruned.
+        """
+        words = phrase.split(' ')
+        count = self.ngrams[len(words)].get(phrase)
+        if not count or not self.total_tokens:
+            return None
+        word_counts = [self.unigrams.get(word) for word in words]
+        if not all(word_counts):
+            return None
+        log_joint = math.log2(count / self.total_tokens)
+        log_independent = sum(math.log2(c / self.total_tokens) for c in word_counts)
+        return log_joint - log_independent
+
+    def top_phrases(
+        self,
+        k: int = 20,
+        min_count: int = DEFAULT_MIN_COUNT
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Phrases ranked by PMI
+
+        Args:
+            k: Number of phrases to return
+            min_count: Ignore n-grams seen fewer times, since PMI
+                overrates rare combinations
+
+        Returns:
+            List of (phrase, count, pmi) tuples, highest PMI first
+        """
+        scored = []
+        for counter in self.ngrams.values():
+            for phrase, count in counter.counts.items():
+                # Only count what is certain, as stored counts may overestimate
+                if count - counter.error < min_count:
+                    continue
+                score = self.pmi(phrase)
+                if score is not None:
+                    scored.append((phrase, count, score))
+        return heapq.nlargest(k, scored, key=lambda x: (x[2], x[1]))
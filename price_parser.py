@@ -0,0 +1,145 @@
+from typing import Dict, NamedTuple, Optional, Sequence
+import re
+
+import numpy as np
+
+from locales import LOCALES, DEFAULT_LOCALE
+from metrics import timed
+
+# Spaces used as thousands separators (the French site uses no-break and
+# narrow no-break spaces)
+SPACE_SEPARATORS = ' \u00a0\u202f'
+
+# Currency markers, with spaces already removed; the regex alternation
+# lists longer markers first so "US$" wins over "$"
+CURRENCY_SYMBOLS = {
+    'US$': 'USD', 'USD': 'USD',
+    'AU$': 'AUD', 'AUD': 'AUD',
+    'C$': 'CAD', 'CAD': 'CAD',
+    '£': 'GBP', 'GBP': 'GBP',
+    '€': 'EUR', 'EUR': 'EUR',
+    '$': None,  # bare dollar sign: the marketplace's own dollar currency
+}
+_CURRENCY_RE = re.compile(
+    r'^(?:[^\n]*?('
+    + '|'.join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+    + r'))?[^\n]*$',
+    re.MULTILINE
+)
+
+# Exact powers of ten, indexed by exponent
+_POW10 = 10.0 ** np.arange(23)
+
+class ParsedPrices(NamedTuple):
+    """Prices parsed from a batch of price strings, NaN where missing"""
+    low: np.ndarray
+    high: np.ndarray
+    currency: np.ndarray
+
+def _translation(decimal: str) -> Dict[int, Optional[str]]:
+    """Table dropping thousands separators and making '.' the decimal point"""
+    table = {ord(c): None for c in SPACE_SEPARATORS}
+    if decimal == ',':
+        table[ord('.')] = None
+        table[ord(',')] = '.'
+    else:
+        table[ord(',')] = None
+    return table
+
+_TRANSLATIONS = {
+    locale: _translation(settings['decimal']) for locale, settings in LOCALES.items()
+}
+
+def _amounts(data: bytes, count: int):
+    """
+    Read up to two amounts from each line of a normalized text buffer
+
+    Works on the raw bytes: digit runs (optionally with one '.') are found
+    with array masks and their values assembled from per-digit powers of
+    ten, so the cost is a fixed number of NumPy passes over the buffer.
+    """
+    low = np.full(count, np.nan)
+    high = np.full(count, np.nan)
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    digit = (buffer - 48) < 10
+    if not digit.any():
+        return low, high
+
+    digit_before = np.concatenate(([False], digit[:-1]))
+    digit_after = np.concatenate((digit[1:], [False]))
+    numeric = digit | ((buffer == 46) & digit_before & digit_after)
+    numeric_before = np.concatenate(([False], numeric[:-1]))
+    numeric_after = np.concatenate((numeric[1:], [False]))
+    starts = np.flatnonzero(numeric & ~numeric_before)
+    ends = np.flatnonzero(numeric & ~numeric_after)
+
+    # Run number of every position, and digits seen up to each position
+    run_of = np.cumsum(numeric & ~numeric_before) - 1
+    digits_seen = np.cumsum(digit)
+
+    # Integer value of each run: every digit times 10 ** digits left in the run
+    digit_positions = np.flatnonzero(digit)
+    runs = run_of[digit_positions]
+    rank = digits_seen[ends[runs]] - digits_seen[digit_positions]
+    integer = np.bincount(
+        runs,
+        weights=(buffer[digit_positions] - 48) * _POW10[np.minimum(rank, 22)],
+        minlength=len(starts)
+    )
+
+    # Scale by the digits after the decimal point
+    fraction_digits = np.zeros(len(starts), dtype=np.int64)
+    points = np.flatnonzero(numeric & ~digit)
+    point_runs = run_of[points]
+    fraction_digits[point_runs] = digits_seen[ends[point_runs]] - digits_seen[points]
+    values = integer / _POW10[np.minimum(fraction_digits, 22)]
+
+    # First run of a line is the price, the second the top of a range
+    lines = np.cumsum(buffer == 10)[starts]
+    first = np.concatenate(([True], lines[1:] != lines[:-1]))
+    second = np.concatenate(([False], first[:-1])) & ~first
+    low[lines[first]] = values[first]
+    high[lines[second]] = values[second]
+    return low, high
+
+@timed('parse_prices')
+def parse_prices(texts: Sequence[Optional[str]], locale: Optional[str] = None) -> ParsedPrices:
+    """
+    Parse a batch of raw price strings at once
+
+    The batch is joined into one newline-separated buffer, thousands
+    separators are stripped and the decimal separator normalized in a
+    single translation, and amounts are then read with array operations
+    instead of a regex per listing. The first amount in a text is its price; a second amount (as
+    in "$10.00 to $25.00") is the top of a price range.
+
+    Args:
+        texts: Price element texts; None for listings without a price
+        locale: Marketplace locale deciding the thousands and decimal
+            separators and what a bare '$' means; defaults to DEFAULT_LOCALE
+
+    Returns:
+        ParsedPrices with float arrays of low and high prices (equal for a
+        single price, NaN where nothing could be parsed) and an object
+        array of ISO currency codes (None where unknown)
+    """
+    locale = locale if locale in LOCALES else DEFAULT_LOCALE
+    count = len(texts)
+    joined = '\n'.join([text or '' for text in texts])
+    if joined.count('\n') > max(count - 1, 0):
+        # A text spans several lines; flatten it so lines match texts again
+        joined = '\n'.join([' '.join(text.splitlines()) if text else '' for text in texts])
+    joined = joined.translate(_TRANSLATIONS[locale])
+
+    low, high = _amounts(joined.encode('utf-8'), count)
+    high = np.where(np.isnan(high), low, high)
+
+    currency_code = LOCALES[locale]['currency']
+    dollar = currency_code if currency_code in ('USD', 'AUD', 'CAD') else 'USD'
+    found = np.array(_CURRENCY_RE.findall(joined) if count else [], dtype=str)
+    currency = np.full(count, None, dtype=object)
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        currency[found == symbol] = code or dollar
+
+    return ParsedPrices(low, high, currency)
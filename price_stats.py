@@ -0,0 +1,236 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+DEFAULT_COMPRESSION = 100
+
+# Fixed log-scale histogram bins shared by every accumulator, so that
+# histograms from different pages or workers can simply be added together
+HISTOGRAM_MIN = 0.01
+HISTOGRAM_MAX = 100_000.0
+HISTOGRAM_BINS_PER_DECADE = 10
+HISTOGRAM_BINS = int(round(math.log10(HISTOGRAM_MAX / HISTOGRAM_MIN))) * HISTOGRAM_BINS_PER_DECADE
+
+REPORTED_QUANTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
+
+class TDigest:
+    """
+    Mergeable approximate quantile sketch (merging t-digest)
+
+    Values are buffered and periodically folded into at most about
+    `compression` weighted centroids, kept small near the tails so extreme
+    quantiles stay accurate. Until the first fold the sketch holds the raw
+    values and quantiles are exact.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_size = 5 * compression
+        self._exact = True
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self._buffer.append((value, weight))
+        self.total += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Fold another digest's centroids and buffered values into this one"""
+        for value, weight in zip(other.means, other.weights):
+            self._buffer.append((value, weight))
+        self._buffer.extend(other._buffer)
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._exact = self._exact and other._exact
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+        return self
+
+    def _k(self, q: float) -> float:
+        # k1 scale function: centroid size shrinks towards q=0 and q=1
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        self._exact = False
+
+        means = []
+        weights = []
+        cum_weight = 0.0
+        cur_mean, cur_weight = points[0]
+        k_left = self._k(0.0)
+        for mean, weight in points[1:]:
+            q_right = (cum_weight + cur_weight + weight) / self.total
+            if self._k(q_right) - k_left <= 1:
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                means.append(cur_mean)
+                weights.append(cur_weight)
+                cum_weight += cur_weight
+                k_left = self._k(cum_weight / self.total)
+                cur_mean, cur_weight = mean, weight
+        means.append(cur_mean)
+        weights.append(cur_weight)
+        self.means = means
+        self.weights = weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-th quantile (0 <= q <= 1), or None if empty"""
+        if self.total == 0:
+            return None
+        q = min(max(q, 0.0), 1.0)
+
+        if self._exact:
+            # Only raw values so far: interpolate between order statistics
+            values = sorted(value for value, _ in self._buffer)
+            pos = q * (len(values) - 1)
+            lower = math.floor(pos)
+            upper = min(lower + 1, len(values) - 1)
+            return values[lower] + (values[upper] - values[lower]) * (pos - lower)
+
+        self._compress()
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return means[0]
+
+        # Interpolate between centroid centers, anchored at min and max
+        target = q * self.total
+        cum = 0.0
+        prev_center, prev_mean = 0.0, self.min
+        for mean, weight in zip(means, weights):
+            center = cum + weight / 2
+            if target < center:
+                span = center - prev_center
+                frac = (target - prev_center) / span if span > 0 else 0.0
+                return prev_mean + (mean - prev_mean) * frac
+            prev_center, prev_mean = center, mean
+            cum += weight
+        span = self.total - prev_center
+        frac = (target - prev_center) / span if span > 0 else 1.0
+        return prev_mean + (self.max - prev_mean) * frac
+
+class PriceAccumulator:
+    """
+    One-pass, mergeable price statistics
+
+    Tracks count, mean and variance (Welford), min, max, approximate
+    quantiles (TDigest) and a fixed-bin log-scale histogram. Accumulators
+    built for different pages or workers can be combined with merge().
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.digest = TDigest(compression)
+        # Bin 0 collects prices below HISTOGRAM_MIN, the last bin those
+        # at or above HISTOGRAM_MAX
+        self.histogram_counts = [0] * (HISTOGRAM_BINS + 2)
+
+    def add(self, price: Optional[float]) -> None:
+        """Add one price; None and NaN are ignored"""
+        if price is None or price != price:
+            return
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (price - self.mean)
+        if price < self.min:
+            self.min = price
+        if price > self.max:
+            self.max = price
+        self.digest.add(price)
+        self.histogram_counts[self._bin(price)] += 1
+
+    def update(self, prices: Iterable[Optional[float]]) -> 'PriceAccumulator':
+        for price in prices:
+            self.add(price)
+        return self
+
+    def merge(self, other: 'PriceAccumulator') -> 'PriceAccumulator':
+        """Combine another accumulator's prices into this one"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.digest.merge(other.digest)
+        self.histogram_counts = [a + b for a, b in zip(self.histogram_counts, other.histogram_counts)]
+        return self
+
+    @staticmethod
+    def _bin(price: float) -> int:
+        if price < HISTOGRAM_MIN:
+            return 0
+        if price >= HISTOGRAM_MAX:
+            return HISTOGRAM_BINS + 1
+        return 1 + int(math.log10(price / HISTOGRAM_MIN) * HISTOGRAM_BINS_PER_DECADE)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.digest.quantile(q)
+
+    def histogram(self) -> List[Tuple[float, float, int]]:
+        """Non-empty histogram bins as (low, high, count) tuples"""
+        bins = []
+        for index, count in enumerate(self.histogram_counts):
+            if not count:
+                continue
+            if index == 0:
+                low, high = 0.0, HISTOGRAM_MIN
+            elif index == HISTOGRAM_BINS + 1:
+                low, high = HISTOGRAM_MAX, math.inf
+            else:
+                low = HISTOGRAM_MIN * 10 ** ((index - 1) / HISTOGRAM_BINS_PER_DECADE)
+                high = HISTOGRAM_MIN * 10 ** (index / HISTOGRAM_BINS_PER_DECADE)
+            bins.append((low, high, count))
+        return bins
+
+    def summary(self) -> Dict[str, float]:
+        """Rounded statistics in the format returned by calculate_price_stats"""
+        if self.count == 0:
+            return empty_price_stats()
+        stats = {
+            'count': self.count,
+            'average': round(self.mean, 2),
+            'min': round(self.min, 2),
+            'max': round(self.max, 2),
+            'std': round(self.std, 2),
+        }
+        for name, q in REPORTED_QUANTILES.items():
+            stats[name] = round(self.quantile(q), 2)
+        return stats
+
+def empty_price_stats() -> Dict[str, float]:
+    """Statistics reported when there are no valid prices"""
+    stats = {'count': 0, 'average': 0.0, 'min': 0.0, 'max': 0.0, 'std': 0.0}
+    stats.update({name: 0.0 for name in REPORTED_QUANTILES})
+    return stats
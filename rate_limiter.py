@@ -0,0 +1,221 @@
+"""
+Per-host request pacing for the scrapers
+
+Every request first takes a token from its host's bucket. Bucket rates
+adapt the way TCP congestion control does (additive increase,
+multiplicative decrease): each successful response raises the rate a
+little, and a throttled one (HTTP 429 or 503) halves it and pauses the
+host, for as long as its Retry-After header asks when it sends one. The
+rate therefore settles just below the highest rate a host sustains,
+instead of bursting into throttling and then sleeping it off. Retries of
+a single request back off with decorrelated jitter.
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Statuses meaning the server wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+# Request Timeout, the one client error that may succeed when repeated
+REQUEST_TIMEOUT_STATUS = 408
+
+# Requests per second and bucket size a host starts with
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 8
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+# Requests per second added per second of throttle-free requests
+RATE_INCREASE = 1.0
+# Factor applied to the rate when a host throttles
+RATE_DECREASE = 0.5
+# Longest Retry-After honored, so a bogus header can't stall a scrape
+MAX_RETRY_AFTER = 120.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait according to a Retry-After header
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Non-negative number of seconds, capped at MAX_RETRY_AFTER, or None
+        if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        seconds = when.timestamp() - time.time()
+    if seconds != seconds:  # NaN
+        return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+def is_retryable_status(status: int) -> bool:
+    """Whether a response status is transient: throttling, a request timeout or a server error"""
+    return status in THROTTLE_STATUSES or status == REQUEST_TIMEOUT_STATUS or 500 <= status < 600
+
+class Backoff:
+    """
+    Retry delays with decorrelated jitter
+
+    Each delay is drawn uniformly between base and three times the previous
+    delay, capped at cap, so concurrent clients retrying after the same
+    failure spread out instead of retrying in lockstep.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 30.0, rng: Optional[random.Random] = None):
+        self.base = base
+        self.cap = cap
+        self.delay = base
+        self._rng = rng or random
+
+    def next(self) -> float:
+        """Return the next delay in seconds"""
+        self.delay = min(self.cap, self._rng.uniform(self.base, self.delay * 3))
+        return self.delay
+
+class TokenBucket:
+    """
+    Token bucket handing out reservations instead of blocking
+
+    reserve() takes a token (possibly one that only becomes available
+    later) and returns how long the caller must wait before using it, so
+    the same bucket paces threads with time.sleep() and coroutines with
+    asyncio.sleep().
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: float = DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        # Time tokens were last counted at; in the future while paused
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            ready = self._updated + max(0.0, -self._tokens) / self.rate
+            return max(0.0, ready - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds`, then restart without a burst"""
+        with self._lock:
+            self._updated = max(self._updated, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def paused_for(self) -> float:
+        """Seconds left of a pause, 0 if not paused"""
+        with self._lock:
+            return max(0.0, self._updated - time.monotonic())
+
+class AdaptiveRateLimiter:
+    """
+    Token buckets per host whose rates adapt to throttling
+
+    Args:
+        rate: Requests per second each host starts at
+        burst: Requests a host may receive back to back after idling
+        min_rate: Lowest rate a host is slowed down to
+        max_rate: Highest rate a host is sped up to
+        increase: Requests per second added per second of success
+        decrease: Factor applied to the rate on throttling
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        increase: float = RATE_INCREASE,
+        decrease: float = RATE_DECREASE
+    ):
+        self.initial_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._buckets: Dict[str, TokenBucket] = {}
+        # Host -> time the rate may be decreased again
+        self._cooldown: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.initial_rate, self.burst)
+            return bucket
+
+    def rate(self, url: str) -> float:
+        """Current rate of the host a URL points to"""
+        return self._bucket(url).rate
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to the URL's host may be sent; returns the time waited"""
+        bucket = self._bucket(url)
+        waited = 0.0
+        wait = bucket.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            waited += wait
+            # The host may have been paused while this request was waiting
+            wait = bucket.paused_for()
+        return waited
+
+    async def acquire_async(self, url: str) -> float:
+        """Like acquire(), but sleeping without blocking the event loop"""
+        bucket = self._bucket(url)
+        waited = 0.0
+        wait = bucket.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+            wait = bucket.paused_for()
+        return waited
+
+    def on_success(self, url: str) -> None:
+        """Record a response that was not throttled"""
+        bucket = self._bucket(url)
+        with self._lock:
+            # Dividing by the rate makes the increase per second, not per request
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+
+    def on_throttle(self, url: str, wait: float) -> None:
+        """
+        Record a throttled response
+
+        Pauses the host for `wait` seconds and lowers its rate. Responses to
+        requests that were already in flight when the host started
+        throttling all arrive together, so the rate is lowered at most once
+        per pause.
+        """
+        bucket = self._bucket(url)
+        host = urlparse(url).netloc.lower()
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._cooldown.get(host, 0.0):
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                self._cooldown[host] = now + max(wait, 1.0 / bucket.rate)
+        bucket.pause(wait)
@@ -1,93 +1,560 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Tuple
+from requests.adapters import HTTPAdapter
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+from listing_parser import get_parser
+from listings import Listing, ListingBatch
+from locales import locale_for_url
+from metrics import increment, timed
+from single_flight import SingleFlight
+from rate_limiter import (
+    AdaptiveRateLimiter, Backoff, is_retryable_status, parse_retry_after, DEFAULT_BURST,
+    DEFAULT_RATE, MAX_RATE, THROTTLE_STATUSES
+)
+from typing import List, Dict, Tuple, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import threading
 import time
-import random
 import re
 
+def _supported_encodings() -> str:
+    """Content encodings urllib3 can transparently decode in this environment"""
+    encodings = 'gzip, deflate'
+    try:
+        import brotli  # noqa: F401
+        encodings += ', br'
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings += ', br'
+        except ImportError:
+            pass
+    return encodings
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    # Only advertise brotli when a decoder is installed, otherwise
+    # response.text would be undecoded bytes
+    'Accept-Encoding': _supported_encodings(),
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+}
+
+MAX_RETRIES = 5
+# Retries of failed requests back off with decorrelated jitter between these
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+ITEMS_PER_PAGE = 60
+
+# Pagination defaults: pages are fetched on a shared thread pool, and no more
+# than PER_HOST_LIMIT requests are in flight against the same host at once
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PER_HOST_LIMIT = 4
+
+# Connection pool size of the shared session; should be at least the number
+# of threads issuing requests so that no connection is thrown away
+DEFAULT_POOL_SIZE = 16
+
+# Query parameters eBay adds for click tracking; they don't change results
+TRACKING_PARAMS = frozenset({
+    '_trksid', '_trkparms', '_from', '_odkw', '_osacat',
+    'hash', 'mkcid', 'mkevt', 'mkrid', 'campid', 'customid', 'toolid',
+})
+
+# Pages being scraped, so concurrent searches for the same page share one
+# fetch and parse
+_page_flights = SingleFlight()
+
+_host_semaphores: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(url: str, limit: int) -> threading.BoundedSemaphore:
+    """Return the shared semaphore bounding concurrent requests to url's host"""
+    key = (urlparse(url).netloc.lower(), limit)
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(limit)
+            _host_semaphores[key] = semaphore
+        return semaphore
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Create a requests session with pooled keep-alive connections
+
+    Args:
+        pool_size: Maximum number of connections kept open per host
+
+    Returns:
+        Session preloaded with the scraper's browser headers
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(HEADERS)
+    return session
+
+def get_session() -> requests.Session:
+    """Return the module-level session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def configure_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Replace the module-level session with one using the given pool size"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = create_session(pool_size)
+        return _session
+
+_cache: Optional[ResponseCache] = None
+
+def configure_cache(
+    directory: Optional[str] = DEFAULT_CACHE_DIR,
+    ttl: float = DEFAULT_TTL,
+    max_entries: int = DEFAULT_MAX_ENTRIES
+) -> Optional[ResponseCache]:
+    """
+    Enable the on-disk response cache used by default for all fetches
+
+    Args:
+        directory: Cache directory, or None to disable caching
+        ttl: Seconds a cached page is served without revalidation
+        max_entries: Maximum number of pages kept before LRU eviction
+
+    Returns:
+        The configured cache, or None when caching was disabled
+    """
+    global _cache
+    _cache = ResponseCache(directory, ttl, max_entries) if directory else None
+    return _cache
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the module-level response cache, if one is configured"""
+    return _cache
+
+_rate_limiter = AdaptiveRateLimiter()
+
+def configure_rate_limiter(
+    rate: float = DEFAULT_RATE,
+    burst: float = DEFAULT_BURST,
+    max_rate: float = MAX_RATE
+) -> AdaptiveRateLimiter:
+    """
+    Replace the rate limiter shared by all fetches
+
+    Args:
+        rate: Requests per second each host starts at
+        burst: Requests a host may receive back to back after idling
+        max_rate: Highest rate a host is sped up to
+
+    Returns:
+        The new rate limiter
+    """
+    global _rate_limiter
+    _rate_limiter = AdaptiveRateLimiter(rate, burst, max_rate=max_rate)
+    return _rate_limiter
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Return the module-level rate limiter"""
+    return _rate_limiter
+
+def is_throttled(error: Exception) -> bool:
+    """Whether a request failed because the server asked us to slow down"""
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in THROTTLE_STATUSES
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed request may succeed when sent again
+
+    Throttling, request timeouts, server errors and dropped or timed out
+    connections are retried; other client errors such as 404 are final.
+    """
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return is_retryable_status(response.status_code)
+    return isinstance(error, (
+        requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError
+    ))
+
+def _set_query_param(url: str, name: str, value: str, overwrite: bool = True) -> str:
+    """Set a query parameter on url, keeping all other parameters in place"""
+    parts = urlparse(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if any(key == name for key, _ in params):
+        if not overwrite:
+            return url
+        params = [(key, value if key == name else val) for key, val in params]
+    else:
+        params.append((name, value))
+    return urlunparse(parts._replace(query=urlencode(params)))
+
+def build_page_url(url: str, page: int = 1) -> str:
+    """
+    Build the URL for one page of search results
+
+    Args:
+        url: eBay search URL
+        page: 1-based results page number, sent as `_pgn`
+
+    Returns:
+        URL requesting ITEMS_PER_PAGE items for the given page
+    """
+    # Always ask for 60 items per page: page offsets and the per-page cap in
+    # parse_listings both assume it, so a search's own _ipg is replaced
+    url = _set_query_param(url, '_ipg', str(ITEMS_PER_PAGE))
+    if page > 1:
+        url = _set_query_param(url, '_pgn', str(page))
+    return url
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a search URL for use as a cache key
+
+    Lowercases the scheme and host, sets `_ipg` to ITEMS_PER_PAGE, drops
+    tracking parameters and sorts the remaining query parameters so
+    equivalent URLs map to the same key.
+    """
+    parts = urlparse(build_page_url(url))
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS
+    )
+    return urlunparse(parts._replace(
+        scheme=parts.scheme.lower(),
+        netloc=parts.netloc.lower(),
+        query=urlencode(params),
+        fragment=''
+    ))
+
+def parse_price_text(price_text: Optional[str]) -> float:
+    """Extract and normalize a price from the text of a price element"""
+    if price_text is None:
+        return None
+    # Extract numbers including decimal points
+    price_match = re.search(r'[\d,]+\.\d{2}', price_text.strip())
+    if price_match:
+        # Remove commas and convert to float
+        return float(price_match.group().replace(',', ''))
+    return None
+
+@timed('extract_price')
 def extract_price(price_elem) -> float:
     """Extract and normalize price from price element"""
     try:
         if not price_elem:
             return None
         # Remove currency symbols and convert to float
-        price_text = price_elem.get_text().strip()
-        # Extract numbers including decimal points
-        price_match = re.search(r'[\d,]+\.\d{2}', price_text)
-        if price_match:
-            # Remove commas and convert to float
-            return float(price_match.group().replace(',', ''))
-        return None
+        return parse_price_text(price_elem.get_text())
     except Exception:
         return None
 
-def scrape_ebay_results(url: str) -> Tuple[List[str], List[float]]:
+@timed('fetch')
+def _fetch_page(
+    url: str,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None
+) -> str:
     """
-    Scrape product titles and prices from eBay search results
+    Download one results page, retrying transient request failures
+
+    Requests are paced by the shared rate limiter. A 429 or 503 response
+    pauses all requests to the host (for its Retry-After if it sends one)
+    and lowers the host's rate; other transient failures are retried after
+    a backoff with decorrelated jitter, and permanent ones (see
+    is_retryable) fail at once.
+    """
+    session = session or get_session()
+    cache = cache or _cache
+    limiter = _rate_limiter
+    backoff = Backoff(RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+    cached = None
+    if cache is not None:
+        cache_key = normalize_url(url)
+        cached = cache.get(cache_key)
+        if cached is not None and cached.fresh:
+            increment('fetch_cache_hits')
+            return cached.body
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            with _host_semaphore(url, per_host_limit):
+                limiter.acquire(url)
+                response = session.get(
+                    url,
+                    headers=cached.conditional_headers() if cached else None,
+                    timeout=10
+                )
+            increment('fetch_requests')
+
+            if response.status_code in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                limiter.on_throttle(url, retry_after if retry_after is not None else backoff.next())
+                increment('fetch_throttled')
+                response.raise_for_status()
+            limiter.on_success(url)
+
+            # Stale entry confirmed unchanged by the origin
+            if response.status_code == 304 and cached is not None:
+                increment('fetch_not_modified')
+                cache.refresh(cache_key)
+                return cached.body
+
+            response.raise_for_status()
+            if cache is not None:
+                cache.put(
+                    cache_key,
+                    response.text,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            return response.text
+
+        except requests.RequestException as e:
+            if not is_retryable(e):
+                increment('fetch_failures')
+                raise Exception(f"Failed to fetch eBay results: {str(e)}")
+            if attempt == MAX_RETRIES - 1:  # Last attempt
+                increment('fetch_failures')
+                raise Exception(f"Failed to fetch eBay results after {MAX_RETRIES} attempts: {str(e)}")
+            increment('fetch_retries')
+            # A throttling host is already paused by the rate limiter
+            if not is_throttled(e):
+                time.sleep(backoff.next())
+
+@timed('parse')
+def parse_listings(
+    html: str,
+    parser: Optional[str] = None,
+    locale: Optional[str] = None
+) -> ListingBatch:
+    """
+    Parse the listings on a results page into a columnar batch
 
     Args:
-        url: eBay search URL
+        html: Results page HTML
+        parser: Listing parser backend name (see listing_parser.PARSER_BACKENDS)
+        locale: Marketplace locale used to read thousands and decimal separators
 
     Returns:
-        Tuple of (list of product titles, list of prices)
+        ListingBatch with at most one page worth of listings
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0'
-    }
-
-    max_retries = 3
-    retry_delay = 2
-
-    for attempt in range(max_retries):
-        try:
-            # Add parameters to show 60 items per page if not present
-            if '_ipg=' not in url:
-                url += '&_ipg=60' if '?' in url else '?_ipg=60'
+    try:
+        # Listings without a title, even one of only whitespace, are dropped
+        raw = [
+            listing for listing in get_parser(parser)(html)
+            if listing['title'] and listing['title'].strip() and 'Shop on eBay' not in listing['title']
+        ]
+        # Limit to one page worth of results
+        raw = raw[:ITEMS_PER_PAGE]
+        increment('pages_parsed')
+        increment('listings_parsed', len(raw))
+        return ListingBatch.from_raw(raw, locale)
 
-            # Add random delay between retries
-            if attempt > 0:
-                time.sleep(retry_delay + random.uniform(1, 3))
+    except Exception as e:
+        raise Exception(f"Error processing eBay page: {str(e)}")
 
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+def parse_page(
+    html: str,
+    parser: Optional[str] = None,
+    locale: Optional[str] = None
+) -> Tuple[List[str], List[float]]:
+    """
+    Parse product titles and prices out of a results page
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+    For a price range the low end is used, and listings without a readable
+    price get None.
+    """
+    batch = parse_listings(html, parser, locale)
+    return batch.titles, batch.prices
 
-            # Find all product titles and prices
-            titles = []
-            prices = []
+def _scrape_page(
+    url: str,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> ListingBatch:
+    """
+    Fetch and parse a single results page
 
-            # Get all item containers
-            items = soup.select('.s-item__wrapper')
+    Concurrent calls for the same page (by normalized URL) share one fetch
+    and parse. The shared ListingBatch must not be modified in place.
+    """
+    key = (normalize_url(url), parser, session, cache)
+    batch, shared = _page_flights.do_shared(
+        key, _fetch_and_parse, url, per_host_limit, session, cache, parser
+    )
+    if shared:
+        increment('pages_coalesced')
+    return batch
 
-            for item in items:
-                # Extract title
-                title_elem = item.select_one('.s-item__title')
-                if title_elem and 'Shop on eBay' not in title_elem.text:
-                    titles.append(title_elem.text.strip())
+def _fetch_and_parse(
+    url: str,
+    per_host_limit: int,
+    session: Optional[requests.Session],
+    cache: Optional[ResponseCache],
+    parser: Optional[str]
+) -> ListingBatch:
+    html = _fetch_page(url, per_host_limit, session, cache)
+    return parse_listings(html, parser, locale_for_url(url))
 
-                    # Extract price
-                    price_elem = item.select_one('.s-item__price')
-                    price = extract_price(price_elem)
-                    prices.append(price)
+def iter_listing_pages(
+    url: str,
+    pages: int = 1,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> Iterator[Tuple[int, ListingBatch]]:
+    """
+    Scrape several pages of search results concurrently
 
-            # Limit to first 60 results
-            return titles[:60], prices[:60]
+    Pages are requested in parallel on a bounded thread pool but yielded
+    strictly in page order, as soon as each page and all pages before it
+    have been parsed. Iteration stops early at the first empty page.
 
-        except requests.RequestException as e:
-            if attempt == max_retries - 1:  # Last attempt
-                raise Exception(f"Failed to fetch eBay results after {max_retries} attempts: {str(e)}")
-            continue  # Try again
-        except Exception as e:
-            raise Exception(f"Error processing eBay page: {str(e)}")
\ No newline at end of file
+    Args:
+        url: eBay search URL
+        pages: Number of result pages to fetch
+        max_workers: Size of the thread pool used for fetching
+        per_host_limit: Maximum concurrent requests against one host
+        session: Session to fetch with; defaults to the shared pooled session
+        cache: Response cache to use; defaults to the configured module cache
+        parser: Listing parser backend name (see listing_parser.PARSER_BACKENDS)
+
+    Yields:
+        Tuples of (page number, ListingBatch) in page order
+    """
+    page_urls = [build_page_url(url, page) for page in range(1, max(pages, 1) + 1)]
+
+    if len(page_urls) == 1:
+        yield 1, _scrape_page(page_urls[0], per_host_limit, session, cache, parser)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(page_urls))))
+    try:
+        futures = [
+            executor.submit(_scrape_page, page_url, per_host_limit, session, cache, parser)
+            for page_url in page_urls
+        ]
+        for page, future in enumerate(futures, 1):
+            batch = future.result()
+            if not len(batch):
+                break
+            yield page, batch
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_listings(
+    url: str,
+    pages: int = 1,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> Iterator[Listing]:
+    """
+    Stream the listings of a search one at a time
+
+    Takes the same arguments as iter_listing_pages. The listings of a page
+    are yielded as soon as it has been parsed, while later pages are still
+    being fetched, so consumers can start on the first page's results
+    without waiting for the whole search.
+
+    Yields:
+        Listing records in page order
+    """
+    for _, batch in iter_listing_pages(
+        url, pages, max_workers, per_host_limit, session, cache, parser
+    ):
+        yield from batch
+
+def iter_ebay_pages(
+    url: str,
+    pages: int = 1,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> Iterator[Tuple[int, List[str], List[float]]]:
+    """
+    Like iter_listing_pages, but yield (page number, titles, prices) tuples
+    """
+    for page, batch in iter_listing_pages(
+        url, pages, max_workers, per_host_limit, session, cache, parser
+    ):
+        yield page, batch.titles, batch.prices
+
+def scrape_ebay_listings(
+    url: str,
+    pages: int = 1,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> ListingBatch:
+    """
+    Scrape full listing records from eBay search results
+
+    Takes the same arguments as scrape_ebay_results.
+
+    Returns:
+        ListingBatch with titles, prices, shipping, condition, sold date,
+        seller, bids and item IDs of all scraped pages
+    """
+    return ListingBatch.concat([
+        batch for _, batch in iter_listing_pages(
+            url, pages, max_workers, per_host_limit, session, cache, parser
+        )
+    ])
+
+def scrape_ebay_results(
+    url: str,
+    pages: int = 1,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = None
+) -> Tuple[List[str], List[float]]:
+    """
+    Scrape product titles and prices from eBay search results
+
+    Args:
+        url: eBay search URL
+        pages: Number of result pages to fetch (60 items each)
+        max_workers: Size of the thread pool used when pages > 1
+        per_host_limit: Maximum concurrent requests against one host
+        session: Session to fetch with; defaults to the shared pooled session
+        cache: Response cache to use; defaults to the configured module cache
+        parser: Listing parser backend name (see listing_parser.PARSER_BACKENDS)
+
+    Returns:
+        Tuple of (list of product titles, list of prices)
+    """
+    batch = scrape_ebay_listings(url, pages, max_workers, per_host_limit, session, cache, parser)
+    return batch.titles, batch.prices
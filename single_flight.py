@@ -0,0 +1,141 @@
+"""
+Coalescing of concurrent identical work
+
+When several callers ask for the same thing at once (batch workers or
+Streamlit sessions scraping the same page), only the first one does the
+work; the others wait for it and get the same result, or the same
+exception. Nothing is remembered once a call finishes, so this only
+removes duplicate work that overlaps in time; results that should be
+reused later belong in a cache.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class _Call:
+    """A call in flight and, once it finishes, its outcome"""
+
+    __slots__ = ('done', 'result', 'error', 'abandoned')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Set when the caller running it was interrupted (KeyboardInterrupt,
+        # SystemExit or a framework's control-flow exception); such an
+        # exception belongs to that caller only, so a waiter runs the call again
+        self.abandoned = False
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time, sharing its result
+
+    Usage:
+        flights = SingleFlight()
+        html = flights.do(url, download, url)
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs) unless a call for key is already running
+
+        Args:
+            key: Identifies calls that are interchangeable
+            func: Function doing the work
+
+        Returns:
+            The result of func, computed by this caller or by the one whose
+            call was in flight; an Exception it raised is raised in every
+            caller sharing the call. If the running caller is interrupted by
+            a BaseException instead, one of the waiters takes over the call.
+        """
+        result, _ = self.do_shared(key, func, *args, **kwargs)
+        return result
+
+    def do_shared(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """Like do(), but also return whether the result came from another caller"""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    break
+
+            call.done.wait()
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys with a call running"""
+        with self._lock:
+            return len(self._calls)
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines
+
+    Calls are only shared between coroutines of the same event loop. The
+    call runs as a task of its own: a cancelled waiter leaves it running
+    for the others, and it is only cancelled once all of its waiters are.
+    """
+
+    def __init__(self):
+        # (loop id, key) -> [task, number of waiters]
+        self._calls: Dict[Tuple[int, Hashable], list] = {}
+
+    async def do_shared(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Await func(*args, **kwargs) unless a call for key is already running
+
+        Returns:
+            Tuple of (result, whether it came from another caller's call)
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        call = self._calls.get(loop_key)
+        shared = call is not None
+        if not shared:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            call = self._calls[loop_key] = [task, 0]
+            task.add_done_callback(lambda done: self._finish(loop_key, done))
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and call[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            call[1] -= 1
+
+    def _finish(self, loop_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        if self._calls.get(loop_key, [None])[0] is task:
+            del self._calls[loop_key]
+        # Mark the outcome as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        result, _ = await self.do_shared(key, func, *args, **kwargs)
+        return result
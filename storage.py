@@ -0,0 +1,170 @@
+"""
+Local history of search snapshots in partitioned Parquet datasets
+
+Every stored scrape appends to three datasets under the store directory:
+
+    listings/query_id=<id>/date=<YYYY-MM-DD>/<snapshot>.parquet
+    keywords/query_id=<id>/date=<YYYY-MM-DD>/<snapshot>.parquet
+    price_stats/query_id=<id>/date=<YYYY-MM-DD>/<snapshot>.parquet
+
+query_id is derived from the normalized search URL, so one query's files
+live under their own directory and reads only ever list that directory;
+the date partition is then pruned by the read filter before any file is
+opened. Each row also records how many result pages the scrape covered,
+so snapshots of different sizes can be told apart.
+"""
+import datetime
+import hashlib
+import os
+import time
+import uuid
+from typing import List, Mapping, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from listings import ListingBatch
+from scraper import normalize_url
+
+DEFAULT_STORE_DIR = '.cache/snapshots'
+DEFAULT_HISTORY_DAYS = 90
+
+DATASETS = ('listings', 'keywords', 'price_stats')
+
+_DATE_PARTITIONING = ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive')
+
+def query_id(url: str) -> str:
+    """Stable partition key for a search URL"""
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()[:16]
+
+class SnapshotStore:
+    """Append-only store of scrape results, partitioned by query and date"""
+
+    def __init__(self, directory: str = DEFAULT_STORE_DIR):
+        self.directory = directory
+
+    def _query_dir(self, dataset: str, url: str) -> str:
+        return os.path.join(self.directory, dataset, f'query_id={query_id(url)}')
+
+    def _write(self, dataset: str, url: str, day: datetime.date, snapshot: str, table: pa.Table) -> None:
+        directory = os.path.join(self._query_dir(dataset, url), f'date={day.isoformat()}')
+        os.makedirs(directory, exist_ok=True)
+        # Write under a hidden temporary name so readers never see a partial file
+        tmp_path = os.path.join(directory, f'.{snapshot}.parquet.tmp')
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(directory, f'{snapshot}.parquet'))
+
+    def append(
+        self,
+        url: str,
+        listings: ListingBatch,
+        keyword_freq: Mapping[str, int],
+        price_stats: Mapping[str, float],
+        scraped_at: Optional[float] = None,
+        pages: Optional[int] = None
+    ) -> str:
+        """
+        Store one scrape of a search
+
+        Args:
+            url: eBay search URL the results came from
+            listings: Scraped listings
+            keyword_freq: Keyword frequencies; a doc_freq attribute, as on
+                analyze_keywords() results, is stored as listing counts
+            price_stats: Price statistics from calculate_price_stats()
+            scraped_at: Unix time of the scrape; defaults to now
+            pages: Number of result pages scraped
+
+        Returns:
+            Snapshot ID shared by the rows written to each dataset
+        """
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        timestamp = pa.scalar(int(scraped_at * 1_000_000), pa.timestamp('us', tz='UTC'))
+        day = datetime.datetime.fromtimestamp(scraped_at, datetime.timezone.utc).date()
+        snapshot = f'{int(scraped_at)}-{uuid.uuid4().hex[:8]}'
+        url = normalize_url(url)
+
+        def with_snapshot_columns(table: pa.Table) -> pa.Table:
+            rows = table.num_rows
+            table = table.append_column('snapshot', pa.array([snapshot] * rows, pa.string()))
+            table = table.append_column('scraped_at', pa.array([timestamp] * rows, timestamp.type))
+            table = table.append_column('search_url', pa.array([url] * rows, pa.string()))
+            return table.append_column('pages', pa.array([pages] * rows, pa.int64()))
+
+        self._write('listings', url, day, snapshot, with_snapshot_columns(listings.to_arrow()))
+
+        doc_freq = getattr(keyword_freq, 'doc_freq', {})
+        keywords = pa.table({
+            'keyword': pa.array(list(keyword_freq), pa.string()),
+            'frequency': pa.array(list(keyword_freq.values()), pa.int64()),
+            'listings': pa.array([doc_freq.get(word) for word in keyword_freq], pa.int64()),
+        })
+        self._write('keywords', url, day, snapshot, with_snapshot_columns(keywords))
+
+        stats = pa.table({name: pa.array([float(value)], pa.float64()) for name, value in price_stats.items()})
+        self._write('price_stats', url, day, snapshot, with_snapshot_columns(stats))
+
+        return snapshot
+
+    def load(
+        self,
+        dataset: str,
+        url: str,
+        days: int = DEFAULT_HISTORY_DAYS,
+        columns: Optional[List[str]] = None,
+        pages: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Read one query's rows from the last `days` days of a dataset
+
+        Only the query's own directory is listed, and date partitions
+        outside the window are pruned without being opened.
+
+        Args:
+            dataset: One of DATASETS
+            url: eBay search URL
+            days: Length of the history window, counted back from today (UTC)
+            columns: Columns to read; all by default
+            pages: Only return snapshots covering this many result pages;
+                snapshots stored before page counts were recorded count
+                as one page
+
+        Returns:
+            DataFrame including 'date' and 'scraped_at' columns, oldest
+            snapshot first; empty if nothing is stored
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(DATASETS)}")
+        directory = self._query_dir(dataset, url)
+        if not os.path.isdir(directory):
+            return pd.DataFrame()
+
+        since = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=days)
+        data = ds.dataset(
+            directory,
+            format='parquet',
+            partitioning=_DATE_PARTITIONING
+        )
+        if columns is not None:
+            columns = [*columns, 'date', 'scraped_at']
+            if pages is not None:
+                columns.append('pages')
+            columns = [name for name in dict.fromkeys(columns) if name in data.schema.names]
+        table = data.to_table(columns=columns, filter=ds.field('date') >= pa.scalar(since, pa.date32()))
+        df = table.to_pandas()
+        if pages is not None:
+            stored = df['pages'].fillna(1) if 'pages' in df else pd.Series(1, index=df.index)
+            df = df[stored == pages]
+        return df.sort_values('scraped_at', kind='stable', ignore_index=True)
+
+    def load_listings(self, url: str, days: int = DEFAULT_HISTORY_DAYS, pages: Optional[int] = None) -> pd.DataFrame:
+        return self.load('listings', url, days, pages=pages)
+
+    def load_keywords(self, url: str, days: int = DEFAULT_HISTORY_DAYS, pages: Optional[int] = None) -> pd.DataFrame:
+        return self.load('keywords', url, days, pages=pages)
+
+    def load_price_stats(self, url: str, days: int = DEFAULT_HISTORY_DAYS, pages: Optional[int] = None) -> pd.DataFrame:
+        return self.load('price_stats', url, days, pages=pages)
+
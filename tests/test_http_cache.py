@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_cache import ResponseCache
+from scraper import _fetch_page, normalize_url
+
+LAST_MODIFIED = 'Wed, 14 Oct 2026 08:00:00 GMT'
+
+class OriginServer(ThreadingHTTPServer):
+    """Local origin serving one page with a validator, answering 304 when it matches"""
+
+    daemon_threads = True
+
+    def __init__(self, validator: str = 'etag'):
+        super().__init__(('127.0.0.1', 0), _OriginHandler)
+        self.validator = validator
+        self.version = 1
+        self.statuses = Counter()
+        self.conditional = []
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/sch/i.html?_nkw=anime+dvd'
+
+class _OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        etag = f'"v{server.version}"'
+        if server.validator == 'etag':
+            condition = self.headers.get('If-None-Match')
+            unchanged = condition == etag
+        else:
+            condition = self.headers.get('If-Modified-Since')
+            unchanged = condition == LAST_MODIFIED and server.version == 1
+        server.conditional.append(condition)
+
+        status = 304 if unchanged else 200
+        server.statuses[status] += 1
+        body = b'' if unchanged else f'<html>page version {server.version}</html>'.encode('utf-8')
+        self.send_response(status)
+        if server.validator == 'etag':
+            self.send_header('ETag', etag)
+        else:
+            self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.session = requests.Session()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.addCleanup(self.session.close)
+
+    def start_server(self, validator: str = 'etag') -> OriginServer:
+        server = OriginServer(validator)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def fetch(self, server: OriginServer, cache: ResponseCache) -> str:
+        return _fetch_page(server.url, session=self.session, cache=cache)
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        server = self.start_server()
+        cache = ResponseCache(self.directory, ttl=60)
+        first = self.fetch(server, cache)
+        server.version = 2
+        self.assertEqual(self.fetch(server, cache), first)
+        self.assertEqual(server.statuses, Counter({200: 1}))
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        server = self.start_server('etag')
+        cache = ResponseCache(self.directory, ttl=0)
+        first = self.fetch(server, cache)
+        stored_at = cache.get(normalize_url(server.url)).stored_at
+
+        self.assertEqual(self.fetch(server, cache), first)
+        self.assertEqual(server.conditional, [None, '"v1"'])
+        self.assertEqual(server.statuses, Counter({200: 1, 304: 1}))
+        # The 304 marks the entry as validated again
+        self.assertGreater(cache.get(normalize_url(server.url)).stored_at, stored_at)
+
+        server.version = 2
+        self.assertEqual(self.fetch(server, cache), '<html>page version 2</html>')
+        self.assertEqual(server.statuses, Counter({200: 2, 304: 1}))
+
+    def test_stale_entry_is_revalidated_with_last_modified(self):
+        server = self.start_server('last_modified')
+        cache = ResponseCache(self.directory, ttl=0)
+        first = self.fetch(server, cache)
+        self.assertEqual(self.fetch(server, cache), first)
+        self.assertEqual(server.conditional, [None, LAST_MODIFIED])
+        self.assertEqual(server.statuses, Counter({200: 1, 304: 1}))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(self.directory, ttl=60, max_entries=2)
+        cache.put('a', 'page a')
+        cache.put('b', 'page b')
+        # Age both entries so the access below is unambiguously the latest
+        past = time.time() - 100
+        for key in ('a', 'b'):
+            os.utime(cache._paths(key)[0], (past, past))
+        cache.get('a')
+
+        cache.put('c', 'page c')
+        self.assertEqual(cache.get('a').body, 'page a')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c').body, 'page c')
+
+if __name__ == '__main__':
+    unittest.main()
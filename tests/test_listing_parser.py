@@ -0,0 +1,31 @@
+import unittest
+
+from benchmarks.fixtures import load_pages
+from listing_parser import get_parser, PARSER_BACKENDS
+from scraper import parse_listings
+
+# The backend the others must agree with
+REFERENCE_BACKEND = 'soup'
+
+class ParserParityTest(unittest.TestCase):
+
+    def test_backends_match_on_fixture_pages(self):
+        pages = load_pages()
+        self.assertTrue(pages, "no fixture pages")
+        for backend in PARSER_BACKENDS:
+            if backend == REFERENCE_BACKEND:
+                continue
+            try:
+                get_parser(backend)
+            except ValueError as e:
+                with self.subTest(backend=backend):
+                    self.skipTest(str(e))
+                continue
+            for page in pages:
+                with self.subTest(backend=backend, page=page.name):
+                    expected = list(parse_listings(page.html, REFERENCE_BACKEND, page.locale))
+                    self.assertTrue(expected)
+                    self.assertEqual(list(parse_listings(page.html, backend, page.locale)), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from phrases import BoundedCounter
+
+class BoundedCounterTest(unittest.TestCase):
+
+    @staticmethod
+    def _late_frequent_key(max_entries):
+        # Two early keys fill the table, then 'x' arrives among fresh keys
+        counter = BoundedCounter(max_entries)
+        for key in ('a', 'b'):
+            counter.add(key, 2)
+        for round_ in range(50):
+            counter.add('x')
+            for i in range(3):
+                counter.add(f'fresh-{round_}-{i}')
+        return counter
+
+    def test_late_frequent_key_is_kept(self):
+        counter = self._late_frequent_key(max_entries=4)
+        count = counter.get('x')
+        self.assertGreaterEqual(count, 50)
+        self.assertLessEqual(count - counter.error, 50)
+
+    def test_late_frequent_key_ranks_first(self):
+        counter = self._late_frequent_key(max_entries=8)
+        self.assertEqual(counter.most_common(1), [('x', 50)])
+
+    def test_counts_are_bounded_upper_estimates(self):
+        stream = [f'k{i % 7}' if i % 3 else f'rare{i}' for i in range(3000)]
+        true_counts = {}
+        for key in stream:
+            true_counts[key] = true_counts.get(key, 0) + 1
+
+        left, right = BoundedCounter(max_entries=20), BoundedCounter(max_entries=20)
+        for i, key in enumerate(stream):
+            (left if i % 2 else right).add(key)
+        counter = left.merge(right)
+
+        for key, true_count in true_counts.items():
+            if true_count > counter.error:
+                self.assertIn(key, counter.counts)
+            if key in counter.counts:
+                self.assertGreaterEqual(counter.get(key), true_count)
+                self.assertLessEqual(counter.get(key) - counter.error, true_count)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import math
+import re
+import unittest
+
+from benchmarks.fixtures import load_pages
+from listing_parser import get_parser
+from price_parser import parse_prices
+from scraper import parse_listings
+
+# Amounts as the French site writes them: no-break space thousands, comma decimals
+_FR_AMOUNT_RE = re.compile(r'\d[\d\u00a0\u202f]*(?:,\d+)?')
+
+def _fr_amounts(text):
+    return [float(re.sub(r'[\u00a0\u202f]', '', amount).replace(',', '.'))
+            for amount in _FR_AMOUNT_RE.findall(text)]
+
+class ParsePricesTest(unittest.TestCase):
+
+    def test_space_thousands_separators(self):
+        prices = parse_prices(
+            ['1 234,56 EUR', '1\u00a0234,56 EUR', '1\u202f234,56 EUR'], 'fr_FR'
+        )
+        self.assertEqual(prices.low.tolist(), [1234.56] * 3)
+        self.assertEqual(prices.high.tolist(), [1234.56] * 3)
+        self.assertEqual(prices.currency.tolist(), ['EUR'] * 3)
+
+    def test_price_range(self):
+        prices = parse_prices(['376,85 EUR à 1\u00a0002,31 EUR'], 'fr_FR')
+        self.assertEqual(prices.low.tolist(), [376.85])
+        self.assertEqual(prices.high.tolist(), [1002.31])
+
+    def test_fr_fixture_pages(self):
+        pages = [page for page in load_pages() if page.locale == 'fr_FR']
+        self.assertTrue(pages, "no fr_FR fixture pages")
+        for page in pages:
+            raw = [listing for listing in get_parser()(page.html)
+                   if listing['title'] and 'Shop on eBay' not in listing['title']]
+            batch = parse_listings(page.html, locale=page.locale)
+            self.assertEqual(len(batch.columns['price']), len(raw), page.name)
+            for listing, low, high in zip(raw, batch.columns['price'], batch.columns['price_high']):
+                amounts = _fr_amounts(listing['price'])
+                with self.subTest(page=page.name, price=listing['price']):
+                    self.assertTrue(math.isclose(low, amounts[0]))
+                    self.assertTrue(math.isclose(high, amounts[-1]))
+
+if __name__ == '__main__':
+    unittest.main()
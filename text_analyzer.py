@@ -1,63 +1,265 @@
-from collections import Counter
-from typing import List, Dict, Optional, Tuple
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import List, Dict, Optional, Tuple, Callable, FrozenSet, Iterable, Iterator, Pattern
+from functools import lru_cache
+import io
+import os
+import re
 import string
 import sys
-from statistics import mean, median
+import time
+from locales import LOCALES, DEFAULT_LOCALE, locale_for_url
+from metrics import increment, is_enabled, observe, timed
+from phrases import PhraseCounter, DEFAULT_MAX_N, DEFAULT_MAX_ENTRIES
+from price_stats import PriceAccumulator, empty_price_stats
+from title_optimizer import optimize_titles
 
-# Download required NLTK data at startup
-print("Downloading required NLTK data...")
-try:
-    # Download required packages
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    print("Successfully downloaded NLTK data")
-except Exception as e:
-    print(f"Error downloading NLTK data: {str(e)}", file=sys.stderr)
-    raise
+# NLTK data is loaded lazily on first use: local data is always tried first,
+# a download is attempted at most once per process (unless disabled with
+# EBAY_ANALYZER_OFFLINE=1), and the bundled fallbacks below are used when
+# neither works
+OFFLINE_ENV_VAR = 'EBAY_ANALYZER_OFFLINE'
 
-def preprocess_text(text: str) -> List[str]:
+# Bundled copy of NLTK's English stopword list
+FALLBACK_STOPWORDS = frozenset({
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
+    "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself',
+    'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her',
+    'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them',
+    'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this',
+    'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does',
+    'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because',
+    'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about',
+    'against', 'between', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off',
+    'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there',
+    'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few',
+    'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only',
+    'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will',
+    'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm',
+    'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't",
+    'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn',
+    "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn',
+    "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't",
+    'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won',
+    "won't", 'wouldn', "wouldn't"
+})
+
+# Minimal bundled lists for the other marketplace languages
+FALLBACK_STOPWORDS_BY_LANGUAGE = {
+    'english': FALLBACK_STOPWORDS,
+    'german': frozenset({
+        'aber', 'alle', 'als', 'also', 'am', 'an', 'auch', 'auf', 'aus', 'bei',
+        'bis', 'das', 'dass', 'dem', 'den', 'der', 'des', 'die', 'ein', 'eine',
+        'einem', 'einen', 'einer', 'eines', 'er', 'es', 'für', 'hat', 'im', 'in',
+        'ist', 'mit', 'nach', 'nicht', 'noch', 'nur', 'oder', 'sie', 'sind', 'so',
+        'über', 'um', 'und', 'uns', 'vom', 'von', 'vor', 'war', 'wie', 'wir',
+        'zu', 'zum', 'zur'
+    }),
+    'french': frozenset({
+        'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'elle',
+        'en', 'est', 'et', 'il', 'je', 'la', 'le', 'les', 'leur', 'lui', 'ma',
+        'mais', 'me', 'mes', 'mon', 'ne', 'nous', 'on', 'ou', 'par', 'pas',
+        'pour', 'qu', 'que', 'qui', 'sa', 'se', 'ses', 'son', 'sur', 'ta', 'te',
+        'tes', 'ton', 'tu', 'un', 'une', 'vos', 'votre', 'vous'
+    }),
+}
+
+# Words that carry no meaning in eBay listing titles
+CUSTOM_STOPWORDS = {
+    'english': frozenset({
+        'new', 'brand', 'lot', 'free', 'shipping', 'sale', 'sealed',
+        'uk', 'us', 'box', 'set', 'edition', 'complete', 'original'
+    }),
+    'german': frozenset({
+        'neu', 'neuwertig', 'ovp', 'versand', 'kostenlos', 'gratis', 'stück',
+        'komplett', 'zustand', 'sammlung', 'paket', 'top'
+    }),
+    'french': frozenset({
+        'neuf', 'neuve', 'livraison', 'gratuite', 'gratuit', 'coffret',
+        'édition', 'complet', 'complète', 'originale', 'vente', 'scellé',
+        'boite', 'boîte'
+    }),
+}
+
+# Typographic quotes and dashes common in German and French titles
+EXTRA_PUNCTUATION = {
+    'english': '',
+    'german': '„“”‚‘’–—…«»',
+    'french': '«»‹›“”‘’–—…',
+}
+
+def _downloads_allowed() -> bool:
+    return os.environ.get(OFFLINE_ENV_VAR, '').lower() not in ('1', 'true', 'yes')
+
+def _download(*packages: str) -> bool:
+    """Try to download NLTK packages, returning True if any succeeded"""
+    if not _downloads_allowed():
+        return False
+    import nltk
+    ok = False
+    for package in packages:
+        try:
+            # Failures are reported once by the caller instead of by NLTK
+            ok = nltk.download(package, quiet=True, raise_on_error=True,
+                               print_error_to=io.StringIO()) or ok
+        except Exception:
+            continue
+    return ok
+
+@lru_cache(maxsize=None)
+def get_stopwords(language: str = 'english') -> FrozenSet[str]:
+    """
+    Load an NLTK stopword list once per process
+
+    Falls back to the bundled list for the language when the corpus is
+    not installed and cannot be downloaded.
+    """
+    try:
+        from nltk.corpus import stopwords
+        try:
+            return frozenset(stopwords.words(language))
+        except LookupError:
+            if not _download('stopwords'):
+                raise
+            return frozenset(stopwords.words(language))
+    except LookupError:
+        print(f"Warning: NLTK '{language}' stopwords not installed, using bundled set",
+              file=sys.stderr)
+    except Exception as e:
+        print(f"Warning: Could not load '{language}' stopwords, using bundled set: {str(e)}",
+              file=sys.stderr)
+    return FALLBACK_STOPWORDS_BY_LANGUAGE.get(language, frozenset())
+
+@lru_cache(maxsize=None)
+def get_word_tokenizer() -> Callable[[str], List[str]]:
+    """
+    Return NLTK's word_tokenize if its Punkt data is available locally or can
+    be downloaded, otherwise plain whitespace splitting
+    """
+    try:
+        from nltk.tokenize import word_tokenize
+        try:
+            word_tokenize('probe text')
+        except LookupError:
+            # Newer NLTK releases ship the tokenizer data as 'punkt_tab'
+            if not _download('punkt_tab', 'punkt'):
+                raise
+            word_tokenize('probe text')
+        return word_tokenize
+    except LookupError:
+        print("Warning: NLTK Punkt data not installed, using simple split", file=sys.stderr)
+    except Exception as e:
+        print(f"Warning: NLTK tokenizer unavailable, using simple split: {str(e)}",
+              file=sys.stderr)
+    return str.split
+
+# Fast tokenizer for punctuation-free titles. It reproduces what NLTK's word
+# tokenizer does once ASCII punctuation is gone: split on whitespace and on
+# the Unicode quotes/dashes NLTK pads, and split the MacIntyre contractions
+# ("cannot" -> "can not", "gonna" -> "gon na", ...)
+_FAST_TOKEN_RE = re.compile(
+    r'\b(?:can(?=not\b)|gim(?=me\b)|gon(?=na\b)|got(?=ta\b)|lem(?=me\b)|wan(?=na(?:\s|$)))'
+    r'|[^\s«“‘„»”’\u2012-\u2015]+'
+)
+
+def regex_tokenize(text: str) -> List[str]:
+    """Split lowercased, punctuation-free text into tokens with one regex"""
+    return _FAST_TOKEN_RE.findall(text)
+
+TOKENIZERS = ('nltk', 'regex')
+
+@dataclass(frozen=True, eq=False)
+class TextProfile:
+    """
+    Immutable stopword and normalization settings for one marketplace
+
+    Built once per locale and shared by every call, so preprocessing does
+    not recompile the punctuation pattern or reload stopwords per title.
+    Profiles pickle as plain fields, so they can be sent to worker processes.
+    """
+    locale: str
+    stopwords: FrozenSet[str]
+    punctuation_re: Pattern[str]
+    min_length: int = 3
+    tokenizer: str = 'nltk'
+
+def build_profile(
+    locale: str = DEFAULT_LOCALE,
+    extra_stopwords: Iterable[str] = (),
+    min_length: int = 3,
+    tokenizer: str = 'nltk'
+) -> TextProfile:
+    """
+    Build a text profile for a marketplace locale
+
+    Args:
+        locale: One of locales.LOCALES
+        extra_stopwords: Additional words to drop from titles
+        min_length: Shortest token length kept
+        tokenizer: 'nltk' for NLTK's word tokenizer, or 'regex' for the
+            faster single-regex tokenizer meant for bulk runs
+
+    Returns:
+        TextProfile combining NLTK stopwords for the locale's language,
+        eBay-specific stopwords and the punctuation pattern
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"Unknown locale '{locale}', expected one of {', '.join(LOCALES)}")
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{tokenizer}', expected one of {', '.join(TOKENIZERS)}")
+    language = LOCALES[locale]['language']
+
+    stop_words = set(get_stopwords(language))
+    stop_words.update(CUSTOM_STOPWORDS['english'])
+    stop_words.update(CUSTOM_STOPWORDS.get(language, ()))
+    stop_words.update(word.lower() for word in extra_stopwords)
+
+    punctuation = string.punctuation + EXTRA_PUNCTUATION.get(language, '')
+    return TextProfile(
+        locale=locale,
+        stopwords=frozenset(stop_words),
+        # Deletes punctuation several times faster than str.translate
+        punctuation_re=re.compile(f'[{re.escape(punctuation)}]+'),
+        min_length=min_length,
+        tokenizer=tokenizer
+    )
+
+@lru_cache(maxsize=None)
+def get_profile(locale: str = DEFAULT_LOCALE, tokenizer: str = 'nltk') -> TextProfile:
+    """Return the shared default profile for a locale"""
+    return build_profile(locale, tokenizer=tokenizer)
+
+def profile_for_url(url: str, tokenizer: str = 'nltk') -> TextProfile:
+    """Return the default profile for the eBay site a search URL points to"""
+    return get_profile(locale_for_url(url), tokenizer)
+
+def preprocess_text(text: str, profile: Optional[TextProfile] = None) -> List[str]:
     """
     Preprocess text by converting to lowercase, removing punctuation,
     and filtering out stopwords and non-alphabetic tokens
     """
     try:
-        # Convert to lowercase
-        text = text.lower()
+        profile = profile or get_profile()
 
-        # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
+        # Convert to lowercase and remove punctuation
+        text = profile.punctuation_re.sub('', text.lower())
 
-        # Simple word splitting as fallback if NLTK tokenization fails
-        try:
-            tokens = word_tokenize(text)
-        except Exception as e:
-            print(f"Warning: NLTK tokenization failed, using simple split: {str(e)}")
-            tokens = text.split()
-
-        # Get English stopwords
-        try:
-            stop_words = set(stopwords.words('english'))
-        except Exception as e:
-            print(f"Warning: Could not load stopwords, using basic set: {str(e)}")
-            stop_words = {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for',
-                         'from', 'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on',
-                         'that', 'the', 'to', 'was', 'were', 'will', 'with'}
-
-        # Add custom stopwords relevant to eBay listings
-        custom_stopwords = {
-            'new', 'brand', 'lot', 'free', 'shipping', 'sale', 'sealed',
-            'uk', 'us', 'box', 'set', 'edition', 'complete', 'original'
-        }
-        stop_words.update(custom_stopwords)
+        if profile.tokenizer == 'regex':
+            tokens = regex_tokenize(text)
+        else:
+            tokens = get_word_tokenizer()(text)
 
         # Filter tokens
+        stop_words = profile.stopwords
+        min_length = profile.min_length
         tokens = [
             token for token in tokens
             if token.isalpha()  # Only alphabetic tokens
-            and len(token) > 2  # Longer than 2 characters
+            and len(token) >= min_length  # Long enough to be meaningful
             and token not in stop_words  # Not a stopword
         ]
 
@@ -66,60 +268,285 @@ def preprocess_text(text: str) -> List[str]:
         print(f"Error during text preprocessing: {str(e)}", file=sys.stderr)
         return []
 
-def analyze_keywords(titles: List[str]) -> Dict[str, int]:
+def _preprocess_all(titles: Iterable[str], profile: Optional[TextProfile]) -> Iterator[List[str]]:
+    """
+    preprocess_text() over a stream of titles
+
+    With metrics enabled the calls are timed and recorded as one batch
+    once the stream ends, rather than one observation per title.
+    """
+    if not is_enabled():
+        for title in titles:
+            yield preprocess_text(title, profile)
+        return
+
+    elapsed = 0.0
+    calls = 0
+    try:
+        for title in titles:
+            start = time.perf_counter()
+            tokens = preprocess_text(title, profile)
+            elapsed += time.perf_counter() - start
+            calls += 1
+            yield tokens
+    finally:
+        observe('preprocess_text', elapsed, calls)
+
+class KeywordFrequencies(dict):
+    """
+    Keyword frequencies of a set of titles
+
+    Maps each keyword to its term frequency (total occurrences), ordered
+    from most to least frequent. doc_freq maps each keyword to the number
+    of titles containing it, so a keyword repeated within one listing
+    counts only once there; documents is the number of titles analyzed.
+    """
+
+    def __init__(self, term_freq=(), doc_freq: Optional[Dict[str, int]] = None, documents: int = 0):
+        super().__init__(term_freq)
+        self.doc_freq = doc_freq if doc_freq is not None else {}
+        self.documents = documents
+
+# Partial keyword counts: (term frequencies, document frequencies, titles)
+KeywordCounts = Tuple[Counter, Counter, int]
+
+DEFAULT_CHUNK_SIZE = 20_000
+
+def _count_keywords(titles: Iterable[str], profile: Optional[TextProfile]) -> KeywordCounts:
+    term_freq = Counter()
+    doc_freq = Counter()
+    documents = 0
+
+    for tokens in _preprocess_all(titles, profile):
+        term_freq.update(tokens)
+        # Each distinct keyword counts once per listing
+        doc_freq.update(set(tokens))
+        documents += 1
+
+    return term_freq, doc_freq, documents
+
+def _to_frequencies(counts: KeywordCounts) -> KeywordFrequencies:
+    term_freq, doc_freq, documents = counts
+    # Sort by frequency, keeping first-seen order among ties
+    return KeywordFrequencies(
+        sorted(term_freq.items(), key=lambda x: x[1], reverse=True),
+        dict(doc_freq),
+        documents
+    )
+
+@timed('analyze_keywords')
+def analyze_keywords(titles: Iterable[str], profile: Optional[TextProfile] = None) -> KeywordFrequencies:
     """
     Analyze keyword frequency in a list of titles
+
+    Titles are consumed one at a time, so any iterable (including a
+    generator over a large archive) can be passed without joining it
+    into a single string.
     """
     try:
-        # Combine all titles
-        all_text = ' '.join(titles)
+        counts = _count_keywords(titles, profile)
+        increment('titles_analyzed', counts[2])
+        return _to_frequencies(counts)
+    except Exception as e:
+        print(f"Error during keyword analysis: {str(e)}", file=sys.stderr)
+        return KeywordFrequencies()
+
+class KeywordAccumulator:
+    """
+    Keyword counts that grow as titles arrive
+
+    Feed titles in any number of update() calls, e.g. one per results
+    page, and read the frequencies so far at any time with frequencies().
+    The final frequencies equal those of analyze_keywords() on all titles.
+    Given a PhraseCounter, the same tokens also feed its n-gram counts, so
+    keywords and phrases take a single tokenization pass.
+    """
+
+    def __init__(self, profile: Optional[TextProfile] = None, phrases: Optional[PhraseCounter] = None):
+        self.profile = profile
+        self.phrases = phrases
+        self.term_freq = Counter()
+        self.doc_freq = Counter()
+        self.documents = 0
+
+    @timed('analyze_keywords')
+    def update(self, titles: Iterable[str]) -> 'KeywordAccumulator':
+        documents = self.documents
+        for tokens in _preprocess_all(titles, self.profile):
+            self.term_freq.update(tokens)
+            # Each distinct keyword counts once per listing
+            self.doc_freq.update(set(tokens))
+            self.documents += 1
+            if self.phrases is not None:
+                self.phrases.update(tokens)
+        increment('titles_analyzed', self.documents - documents)
+        return self
+
+    def frequencies(self) -> KeywordFrequencies:
+        """Frequencies of the titles seen so far, like analyze_keywords()"""
+        return _to_frequencies((self.term_freq, self.doc_freq, self.documents))
+
+_worker_profile: Optional[TextProfile] = None
+
+def _init_keyword_worker(profile: TextProfile) -> None:
+    global _worker_profile
+    _worker_profile = profile
+
+def _count_keyword_chunk(titles: List[str]) -> KeywordCounts:
+    return _count_keywords(titles, _worker_profile)
+
+def _merge_keyword_counts(left: KeywordCounts, right: KeywordCounts) -> KeywordCounts:
+    # Counter.update appends unseen keys in the right part's order, so
+    # merging earlier chunks into later ones keeps first-seen order
+    left[0].update(right[0])
+    left[1].update(right[1])
+    return left[0], left[1], left[2] + right[2]
 
-        # Preprocess and tokenize
-        tokens = preprocess_text(all_text)
+def _tree_reduce(parts: List[KeywordCounts]) -> KeywordCounts:
+    """Merge partial counts pairwise, level by level, keeping chunk order"""
+    while len(parts) > 1:
+        merged = [
+            _merge_keyword_counts(parts[i], parts[i + 1])
+            for i in range(0, len(parts) - 1, 2)
+        ]
+        if len(parts) % 2:
+            merged.append(parts[-1])
+        parts = merged
+    return parts[0]
+
+@timed('analyze_keywords_parallel')
+def analyze_keywords_parallel(
+    titles: Iterable[str],
+    profile: Optional[TextProfile] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> KeywordFrequencies:
+    """
+    Analyze keyword frequency across a process pool
+
+    Titles are split into chunks of chunk_size, each counted by a worker
+    process, and the partial counts are combined with a tree reduction.
+    The result is identical to analyze_keywords(), including the order of
+    keywords with equal frequency.
+
+    Args:
+        titles: Titles to analyze; consumed lazily, with at most
+            2 * workers chunks in flight
+        profile: Text profile; defaults to the shared default profile
+        workers: Number of worker processes; defaults to the CPU count
+        chunk_size: Titles per chunk sent to a worker
+
+    Returns:
+        KeywordFrequencies like analyze_keywords()
+    """
+    workers = workers or os.cpu_count() or 1
+    profile = profile or get_profile()
+    if workers <= 1:
+        return analyze_keywords(titles, profile)
 
-        # Count frequencies
-        keyword_freq = Counter(tokens)
+    try:
+        title_iter = iter(titles)
+        parts = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_keyword_worker,
+            initargs=(profile,)
+        ) as executor:
+            in_flight = deque()
+            while True:
+                chunk = list(islice(title_iter, chunk_size))
+                if not chunk:
+                    break
+                in_flight.append(executor.submit(_count_keyword_chunk, chunk))
+                # Keep a bounded window of chunks in flight
+                if len(in_flight) >= workers * 2:
+                    parts.append(in_flight.popleft().result())
+            parts.extend(future.result() for future in in_flight)
 
-        # Convert to dictionary and sort by frequency
-        return dict(sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True))
+        if not parts:
+            return KeywordFrequencies()
+        counts = _tree_reduce(parts)
+        increment('titles_analyzed', counts[2])
+        return _to_frequencies(counts)
     except Exception as e:
         print(f"Error during keyword analysis: {str(e)}", file=sys.stderr)
-        return {}
+        return KeywordFrequencies()
 
-def suggest_title(keyword_freq: Dict[str, int], max_length: int = 80) -> str:
+@timed('analyze_phrases')
+def analyze_phrases(
+    titles: Iterable[str],
+    profile: Optional[TextProfile] = None,
+    max_n: int = DEFAULT_MAX_N,
+    max_entries: int = DEFAULT_MAX_ENTRIES
+) -> PhraseCounter:
+    """
+    Count bigrams and longer n-grams in a stream of titles
+
+    Titles are preprocessed like in analyze_keywords and consumed one at a
+    time; n-gram counts are kept in bounded memory. Use top_ngrams() for
+    the most frequent phrases and top_phrases() for PMI-ranked ones.
+    """
+    counter = PhraseCounter(max_n, max_entries)
+    try:
+        for tokens in _preprocess_all(titles, profile):
+            counter.update(tokens)
+    except Exception as e:
+        print(f"Error during phrase analysis: {str(e)}", file=sys.stderr)
+    return counter
+
+@timed('suggest_title')
+def suggest_title(
+    keyword_freq: Dict[str, int],
+    max_length: int = 80,
+    optimize: bool = False,
+    phrase_counter: Optional[PhraseCounter] = None,
+    optimized: Optional[List[Tuple[str, float]]] = None
+) -> str:
     """
     Generate a suggested title based on keyword frequency analysis
     with optimized character usage within the 80-char limit
+
+    With optimize=True the title is chosen by title_optimizer, which packs
+    the character budget with the most valuable keywords and, if
+    phrase_counter is given, phrases. Pass the result of an earlier
+    optimize_titles() call as `optimized` to build on its best title
+    instead of running the optimizer again.
     """
     try:
-        # Get more keywords than we might need to have options
-        top_keywords = list(keyword_freq.items())[:10]  # Get top 10 instead of 5
-
-        # Sort keywords by frequency
-        sorted_keywords = sorted(top_keywords, key=lambda x: x[1], reverse=True)
-
-        # Build title starting with most frequent keywords
-        title_parts = []
-        current_length = 0
-
-        for keyword, freq in sorted_keywords:
-            # Calculate length with spacing and potential comma
-            word_length = len(keyword)
-            space_needed = 1 if title_parts else 0  # Space needed if not first word
-            comma_needed = 1 if title_parts else 0  # Comma needed if not first word
-            total_addition = word_length + space_needed + comma_needed
-
-            # Check if adding this word would exceed the limit
-            if current_length + total_addition <= max_length:
-                # Add appropriate spacing and punctuation
-                if title_parts:
-                    title_parts.append(", ")
-                    current_length += 2  # Length of ", "
-
-                title_parts.append(keyword.title())  # Capitalize each word
-                current_length += word_length
-            else:
-                break
+        if optimize:
+            best = optimized if optimized is not None else optimize_titles(
+                keyword_freq, phrase_counter, max_length, k=1
+            )
+            title_parts = [best[0][0]] if best else []
+        else:
+            # Get more keywords than we might need to have options
+            top_keywords = list(keyword_freq.items())[:10]  # Get top 10 instead of 5
+
+            # Sort keywords by frequency
+            sorted_keywords = sorted(top_keywords, key=lambda x: x[1], reverse=True)
+
+            # Build title starting with most frequent keywords
+            title_parts = []
+            current_length = 0
+
+            for keyword, freq in sorted_keywords:
+                # Calculate length with spacing and potential comma
+                word_length = len(keyword)
+                space_needed = 1 if title_parts else 0  # Space needed if not first word
+                comma_needed = 1 if title_parts else 0  # Comma needed if not first word
+                total_addition = word_length + space_needed + comma_needed
+
+                # Check if adding this word would exceed the limit
+                if current_length + total_addition <= max_length:
+                    # Add appropriate spacing and punctuation
+                    if title_parts:
+                        title_parts.append(", ")
+                        current_length += 2  # Length of ", "
+
+                    title_parts.append(keyword.title())  # Capitalize each word
+                    current_length += word_length
+                else:
+                    break
 
         # Join all parts
         title = "".join(title_parts)
@@ -137,33 +564,17 @@ def suggest_title(keyword_freq: Dict[str, int], max_length: int = 80) -> str:
         print(f"Error generating title suggestion: {str(e)}", file=sys.stderr)
         return "Could not generate title suggestion"
 
-def calculate_price_stats(prices: List[float]) -> Dict[str, float]:
+@timed('calculate_price_stats')
+def calculate_price_stats(prices: Iterable[Optional[float]]) -> Dict[str, float]:
     """
     Calculate price statistics from the listings
+
+    Prices are consumed in a single pass with a PriceAccumulator; None
+    values are skipped. Besides average, median, min and max the result
+    includes count, std and the p10/p25/p75/p90 pricing bands.
     """
     try:
-        # Filter out None values
-        valid_prices = [p for p in prices if p is not None]
-
-        if not valid_prices:
-            return {
-                'average': 0.0,
-                'median': 0.0,
-                'min': 0.0,
-                'max': 0.0
-            }
-
-        return {
-            'average': round(mean(valid_prices), 2),
-            'median': round(median(valid_prices), 2),
-            'min': round(min(valid_prices), 2),
-            'max': round(max(valid_prices), 2)
-        }
+        return PriceAccumulator().update(prices).summary()
     except Exception as e:
         print(f"Error calculating price statistics: {str(e)}", file=sys.stderr)
-        return {
-            'average': 0.0,
-            'median': 0.0,
-            'min': 0.0,
-            'max': 0.0
-        }
\ No newline at end of file
+        return empty_price_stats()
@@ -0,0 +1,129 @@
+"""
+Title suggestion as a knapsack over keywords and phrases
+
+Candidates are the top keywords and, when a PhraseCounter is given, the
+most frequent bigrams and trigrams. Each candidate costs its length plus
+a ", " separator and is worth the share of listings it covers; a phrase
+is worth its words plus a bonus for appearing as a phrase, and candidates
+sharing a word are never combined. A dynamic program over the character
+budget keeps the k best selections per budget, so the best title and its
+runner-up alternatives come out of one pass. Word conflicts are checked
+against those k selections only, so with phrases the result is a very
+good rather than a provably optimal title.
+"""
+from typing import List, Mapping, Tuple
+
+DEFAULT_MAX_LENGTH = 80
+DEFAULT_ALTERNATIVES = 5
+MAX_KEYWORD_CANDIDATES = 25
+MAX_PHRASE_CANDIDATES = 10
+MIN_PHRASE_COUNT = 3
+SEPARATOR = ', '
+
+# A selection: (value, candidate indices, bitmask of the words it uses)
+_Selection = Tuple[float, Tuple[int, ...], int]
+
+def _candidates(
+    keyword_freq: Mapping[str, int],
+    phrase_counter=None
+) -> List[Tuple[str, float, int]]:
+    """Candidates as (text, value, word bitmask), keywords first"""
+    doc_freq = getattr(keyword_freq, 'doc_freq', None)
+    documents = getattr(keyword_freq, 'documents', 0)
+    top = list(keyword_freq.items())[:MAX_KEYWORD_CANDIDATES]
+    if not top:
+        return []
+
+    highest = top[0][1] or 1
+
+    # Worth of a keyword: share of listings containing it, or its frequency
+    # relative to the most frequent keyword when listing counts are unknown
+    def worth(word: str) -> float:
+        if doc_freq and documents:
+            return doc_freq.get(word, keyword_freq.get(word, 0)) / documents
+        return keyword_freq.get(word, 0) / highest
+
+    values = {word: worth(word) for word, _ in top}
+    bits = {word: 1 << i for i, (word, _) in enumerate(top)}
+
+    candidates = [(word, values[word], bits[word]) for word, _ in top]
+    if phrase_counter is not None and phrase_counter.documents:
+        phrases = []
+        for n in sorted(phrase_counter.ngrams):
+            phrases.extend(phrase_counter.top_ngrams(n, MAX_PHRASE_CANDIDATES))
+        phrases.sort(key=lambda x: x[1], reverse=True)
+        for phrase, count in phrases[:MAX_PHRASE_CANDIDATES]:
+            words = phrase.split(' ')
+            if count < MIN_PHRASE_COUNT or len(set(words)) < len(words):
+                continue
+            mask = 0
+            for word in words:
+                if word not in bits:
+                    # Word outside the top keywords: only usable inside phrases
+                    bits[word] = 1 << len(bits)
+                    values[word] = worth(word)
+                mask |= bits[word]
+            value = sum(values[word] for word in words) + count / phrase_counter.documents
+            candidates.append((phrase, value, mask))
+    return candidates
+
+def optimize_titles(
+    keyword_freq: Mapping[str, int],
+    phrase_counter=None,
+    max_length: int = DEFAULT_MAX_LENGTH,
+    k: int = DEFAULT_ALTERNATIVES
+) -> List[Tuple[str, float]]:
+    """
+    Find the highest-value titles that fit within max_length
+
+    Args:
+        keyword_freq: Keyword frequencies, ideally from analyze_keywords()
+            so listing counts (doc_freq) can be used as weights
+        phrase_counter: Optional PhraseCounter supplying phrase candidates
+        max_length: Maximum title length in characters
+        k: Number of alternative titles to return
+
+    Returns:
+        Up to k (title, score) tuples, best first; the score is the summed
+        value of the keywords and phrases used
+    """
+    candidates = _candidates(keyword_freq, phrase_counter)
+    if not candidates or k < 1:
+        return []
+
+    # Every part after the first is preceded by a separator; charging the
+    # separator to all parts and adding it to the budget evens that out
+    separator = len(SEPARATOR)
+    budget = max_length + separator
+    empty: _Selection = (0.0, (), 0)
+    # best[c]: up to k best selections costing at most c characters, best
+    # first. Selections with and without a candidate never coincide, so
+    # the lists stay free of duplicates
+    best: List[List[_Selection]] = [[empty] for _ in range(budget + 1)]
+
+    for index, (text, value, mask) in enumerate(candidates):
+        cost = len(text) + separator
+        if cost > budget:
+            continue
+        # 0/1 knapsack: walk budgets downwards so each candidate is used once
+        for capacity in range(budget, cost - 1, -1):
+            current = best[capacity]
+            floor = current[-1][0] if len(current) == k else -1.0
+            extended = [
+                (total + value, chosen + (index,), used | mask)
+                for total, chosen, used in best[capacity - cost]
+                if total + value > floor and not used & mask
+            ]
+            if extended:
+                merged = current + extended
+                merged.sort(key=lambda x: x[0], reverse=True)
+                best[capacity] = merged[:k]
+
+    titles = []
+    for total, chosen, _ in best[budget]:
+        if not chosen:
+            continue
+        # Most valuable part first, like a hand-written title
+        parts = sorted(chosen, key=lambda i: candidates[i][1], reverse=True)
+        titles.append((SEPARATOR.join(candidates[i][0].title() for i in parts), round(total, 4)))
+    return titles
@@ -0,0 +1,278 @@
+"""
+Incremental keyword and price trends per search query
+
+A QueryTrend is updated once per new snapshot of a query, touching only
+the keywords of that snapshot and of the one before it. Each keyword keeps
+an exponentially weighted moving average (EWMA) of its listing share, the
+fraction of listings whose title contains it. The average is decayed
+lazily: a keyword missing from a snapshot contributes a share of 0, which
+only scales its average, so the scale is applied when the keyword is next
+read rather than on every update.
+"""
+import json
+import math
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from storage import SnapshotStore, query_id, DEFAULT_HISTORY_DAYS
+
+DEFAULT_STATE_DIR = '.cache/trends'
+
+# Weight of the newest snapshot in the moving averages
+DEFAULT_ALPHA = 0.3
+# Keywords whose average share decays below this are forgotten; the scan
+# runs every PRUNE_INTERVAL snapshots so its cost is spread over updates
+MIN_BASELINE_SHARE = 1e-4
+PRUNE_INTERVAL = 10
+
+@dataclass
+class QueryTrend:
+    """Trend state of one query"""
+    alpha: float = DEFAULT_ALPHA
+    snapshots: int = 0
+    last_scraped_at: Optional[float] = None
+    # Listing share of each keyword in the latest and the previous snapshot
+    shares: Dict[str, float] = field(default_factory=dict)
+    previous_shares: Dict[str, float] = field(default_factory=dict)
+    # keyword -> [EWMA of its share, index of the snapshot it was last updated at]
+    baseline: Dict[str, List[float]] = field(default_factory=dict)
+    # Latest share minus the average before the latest snapshot
+    momentum: Dict[str, float] = field(default_factory=dict)
+    price_stats: Dict[str, float] = field(default_factory=dict)
+    previous_price_stats: Dict[str, float] = field(default_factory=dict)
+    median_ewma: Optional[float] = None
+    # ListingBatch.fingerprint() of the latest snapshot, to spot repeats
+    fingerprint: Optional[str] = None
+
+    def _baseline_at(self, keyword: str, index: int) -> float:
+        """Bias-corrected average share after snapshot `index`"""
+        entry = self.baseline.get(keyword)
+        if entry is None or index < 0:
+            return 0.0
+        value, updated = entry
+        keep = 1 - self.alpha
+        return value * keep ** (index - updated) / (1 - keep ** (index + 1))
+
+    def update(
+        self,
+        keyword_freq: Mapping[str, int],
+        documents: int,
+        price_stats: Mapping[str, float],
+        scraped_at: Optional[float] = None,
+        fingerprint: Optional[str] = None
+    ) -> None:
+        """
+        Fold one new snapshot into the trend
+
+        Args:
+            keyword_freq: Keyword frequencies of the snapshot; listing
+                counts from a doc_freq attribute are used when present
+            documents: Number of listings in the snapshot
+            price_stats: Price statistics of the snapshot
+            scraped_at: Unix time of the snapshot
+            fingerprint: Fingerprint of the snapshot's listings
+        """
+        counts = getattr(keyword_freq, 'doc_freq', keyword_freq)
+        shares = {word: count / documents for word, count in counts.items()} if documents else {}
+
+        index = self.snapshots
+        keep = 1 - self.alpha
+        momentum = {}
+        for word in shares.keys() | self.shares.keys():
+            share = shares.get(word, 0.0)
+            momentum[word] = share - self._baseline_at(word, index - 1)
+            if word in shares:
+                entry = self.baseline.get(word)
+                decayed = entry[0] * keep ** (index - entry[1]) if entry else 0.0
+                self.baseline[word] = [keep * decayed + self.alpha * share, index]
+
+        self.previous_shares, self.shares = self.shares, shares
+        self.momentum = momentum
+        self.snapshots = index + 1
+        self.last_scraped_at = scraped_at
+        self.fingerprint = fingerprint
+
+        self.previous_price_stats, self.price_stats = self.price_stats, dict(price_stats)
+        median = price_stats.get('median')
+        if median is not None and price_stats.get('count'):
+            self.median_ewma = median if self.median_ewma is None else (
+                keep * self.median_ewma + self.alpha * median
+            )
+
+    def prune(self) -> None:
+        """Forget keywords whose average share has decayed to almost nothing"""
+        latest = self.snapshots - 1
+        self.baseline = {
+            word: entry for word, entry in self.baseline.items()
+            if word in self.shares or self._baseline_at(word, latest) >= MIN_BASELINE_SHARE
+        }
+
+    def keyword_deltas(self) -> List[Tuple[str, float, float, float]]:
+        """(keyword, previous share, share, change) since the previous snapshot, largest change first"""
+        deltas = [
+            (word, self.previous_shares.get(word, 0.0), self.shares.get(word, 0.0))
+            for word in self.shares.keys() | self.previous_shares.keys()
+        ]
+        return sorted(
+            ((word, before, after, after - before) for word, before, after in deltas),
+            key=lambda x: (-abs(x[3]), x[0])
+        )
+
+    def rising(self, k: int = 15) -> List[Tuple[str, float, float, float]]:
+        """Keywords most above their moving average: (keyword, share, average, momentum)"""
+        return self._ranked(k, reverse=True)
+
+    def falling(self, k: int = 15) -> List[Tuple[str, float, float, float]]:
+        """Keywords most below their moving average: (keyword, share, average, momentum)"""
+        return self._ranked(k, reverse=False)
+
+    def _ranked(self, k: int, reverse: bool) -> List[Tuple[str, float, float, float]]:
+        if self.snapshots < 2:
+            return []
+        ranked = sorted(
+            self.momentum.items(),
+            key=lambda x: (-x[1] if reverse else x[1], x[0])
+        )
+        rows = []
+        for word, momentum in ranked[:k]:
+            # Stop at keywords that did not move (up to float rounding)
+            if (momentum > 0) != reverse or math.isclose(momentum, 0.0, abs_tol=1e-9):
+                break
+            share = self.shares.get(word, 0.0)
+            rows.append((word, share, share - momentum, momentum))
+        return rows
+
+    def price_movement(self) -> Dict[str, Optional[float]]:
+        """Change of the average and median price since the previous snapshot"""
+        movement = {'median_ewma': self.median_ewma}
+        for name in ('average', 'median'):
+            now = self.price_stats.get(name)
+            before = self.previous_price_stats.get(name)
+            movement[name] = now
+            if now is None or not before:
+                movement[f'{name}_change'] = None
+                movement[f'{name}_change_pct'] = None
+            else:
+                movement[f'{name}_change'] = now - before
+                movement[f'{name}_change_pct'] = (now - before) / before * 100
+        return movement
+
+class TrendTracker:
+    """
+    Trend state for many queries, loaded and saved one query at a time
+
+    Each query's QueryTrend is kept in a small JSON file, so updating one
+    query never reads or rewrites the others. Scrapes of a different number
+    of result pages are separate queries: a larger sample would otherwise
+    show up as keyword and price movement.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STATE_DIR, alpha: float = DEFAULT_ALPHA):
+        self.directory = directory
+        self.alpha = alpha
+        self._trends: Dict[str, QueryTrend] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _load(self, key: str) -> Optional[QueryTrend]:
+        trend = self._trends.get(key)
+        if trend is None and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    trend = QueryTrend(**json.load(f))
+                self._trends[key] = trend
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Error loading trend state {key}: {str(e)}", file=sys.stderr)
+        return trend
+
+    def _save(self, key: str, trend: QueryTrend) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(trend), f)
+        os.replace(tmp_path, self._path(key))
+
+    @staticmethod
+    def _key(url: str, pages: int) -> str:
+        return f'{query_id(url)}-p{pages}'
+
+    def get(self, url: str, pages: int = 1) -> Optional[QueryTrend]:
+        """Trend of a search scraped `pages` pages deep, or None if no snapshot has been tracked"""
+        with self._lock:
+            return self._load(self._key(url, pages))
+
+    def update(
+        self,
+        url: str,
+        keyword_freq: Mapping[str, int],
+        documents: int,
+        price_stats: Mapping[str, float],
+        scraped_at: Optional[float] = None,
+        fingerprint: Optional[str] = None,
+        pages: int = 1
+    ) -> QueryTrend:
+        """Fold a new snapshot of a search, scraped `pages` pages deep, into its trend and save it"""
+        key = self._key(url, pages)
+        with self._lock:
+            trend = self._load(key) or QueryTrend(alpha=self.alpha)
+            trend.update(keyword_freq, documents, price_stats, scraped_at, fingerprint)
+            if trend.snapshots % PRUNE_INTERVAL == 0:
+                trend.prune()
+            self._trends[key] = trend
+            self._save(key, trend)
+            return trend
+
+    def rebuild(
+        self,
+        url: str,
+        store: SnapshotStore,
+        pages: int = 1,
+        days: int = DEFAULT_HISTORY_DAYS
+    ) -> Optional[QueryTrend]:
+        """
+        Recreate a search's trend from the snapshots in a SnapshotStore
+
+        Only needed to seed queries that were stored before tracking
+        started; afterwards update() keeps the trend current. Only
+        snapshots covering `pages` result pages are used.
+        """
+        stats = store.load('price_stats', url, days, pages=pages)
+        if stats.empty:
+            return None
+        keywords = store.load(
+            'keywords', url, days, columns=['snapshot', 'keyword', 'frequency', 'listings'], pages=pages
+        )
+        documents = store.load('listings', url, days, columns=['snapshot'], pages=pages)['snapshot'].value_counts()
+        by_snapshot = dict(tuple(keywords.groupby('snapshot'))) if not keywords.empty else {}
+
+        trend = QueryTrend(alpha=self.alpha)
+        for row in stats.to_dict('records'):
+            rows = by_snapshot.get(row['snapshot'])
+            counts = {}
+            if rows is not None:
+                # Listing counts where stored, plain frequencies otherwise
+                listings = rows['listings'].fillna(rows['frequency'])
+                counts = dict(zip(rows['keyword'], listings.astype(int)))
+            price_stats = {
+                name: value for name, value in row.items()
+                if name not in ('snapshot', 'scraped_at', 'search_url', 'pages', 'date')
+                and isinstance(value, float) and not math.isnan(value)
+            }
+            trend.update(
+                counts,
+                int(documents.get(row['snapshot'], 0)),
+                price_stats,
+                row['scraped_at'].timestamp()
+            )
+        trend.prune()
+
+        key = self._key(url, pages)
+        with self._lock:
+            self._trends[key] = trend
+            self._save(key, trend)
+        return trend